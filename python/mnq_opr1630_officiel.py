@@ -1,9 +1,21 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import multiprocessing
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba optionnel : mêmes noyaux, exécutés en Python pur
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+    prange = range
+
 # =====================================================
 # CONFIG — Stratégie finale (Box 1h + Cassure BREAK_TF + Wick<=x%) avec SL paramétrable
 # =====================================================
@@ -51,6 +63,10 @@ BREAK_TF = "5min"
 # ex: 0.22 (=22%), 0.25 (=25%), etc.
 STOP_FRAC = 0.50
 
+# Simulation des setups en parallèle (processus) : 1 => séquentiel, -1 => tous les cœurs
+N_JOBS = -1
+PARALLEL_MIN_SETUPS = 500     # en dessous, le lancement des processus coûte plus qu'il ne rapporte
+
 # Sortie / plots
 SHOW_PLOTS = True
 SAVE_PLOTS = True
@@ -64,6 +80,17 @@ FiveMinAgg = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}
 def _norm(s: Any) -> str:
     return "".join(ch.lower() for ch in str(s) if ch.isalnum())
 
+def _hhmm(hhmm: str) -> int:
+    """Heure "HH:MM" -> entier HHMM (ex: "09:30" -> 930)."""
+    h, m = hhmm.split(":")
+    return int(h) * 100 + int(m)
+
+def _ny_hhmm(index: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """Index -> (jour NY en entier depuis 1970-01-01, heure NY en HHMM entier), une seule conversion de fuseau."""
+    ny = index.tz_convert(EXCHANGE_TZ)
+    ny_day = ny.tz_localize(None).values.astype("datetime64[D]").astype(np.int64)
+    return ny_day, np.asarray(ny.hour * 100 + ny.minute)
+
 def passes_box_filter(box_high: float, box_low: float) -> bool:
     if not BOX_FILTER_ENABLE:
         return True
@@ -112,65 +139,109 @@ def load_ohlc_paris(csv_path: str) -> pd.DataFrame:
     ohlc = df.set_index("Time_PARIS")[['Open', 'High', 'Low', 'Close']].copy()
     return ohlc
 
-def first_break_close_out(df_brk_day: pd.DataFrame, bh: float, bl: float) -> Tuple[Optional[str], Optional[pd.Timestamp], Optional[pd.Timestamp], Optional[float]]:
+def outside_wick_frac(side_long: np.ndarray, bh: np.ndarray, bl: np.ndarray,
+                      o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
     """
-    Première clôture (au TF BREAK_TF) qui sort de la box, entre BREAK_SCAN_START_NY et BREAK_SCAN_END_NY (index Paris).
-    """
-    df_brk_ny = df_brk_day.tz_convert(EXCHANGE_TZ).between_time(BREAK_SCAN_START_NY, BREAK_SCAN_END_NY)
-    for ts_ny, row in df_brk_ny.iterrows():
-        c = float(row["Close"])
-        if c > bh:
-            ts_paris = ts_ny.tz_convert(LOCAL_TZ)
-            return "long", ts_paris, ts_paris + pd.Timedelta(BREAK_TF), c
-        if c < bl:
-            ts_paris = ts_ny.tz_convert(LOCAL_TZ)
-            return "short", ts_paris, ts_paris + pd.Timedelta(BREAK_TF), c
-    return None, None, None, None
-
-def outside_wick_frac(side: str, bh: float, bl: float, o: float, h: float, l: float, c: float) -> float:
-    """
-    Mèche côté cassure / range bougie (0..1).
+    Mèche côté cassure / range bougie (0..1), sur des tableaux de bougies.
     - long: mèche haute (High - max(Open,Close))
     - short: mèche basse (min(Open,Close) - Low)
     """
-    rng = max(h - l, 1e-12)
-    body_hi = max(o, c)
-    body_lo = min(o, c)
-    if side == "long":
-        wick_out = max(0.0, h - body_hi)
-    else:
-        wick_out = max(0.0, body_lo - l)
-    return float(wick_out / rng)
+    rng = np.maximum(h - l, 1e-12)
+    body_hi = np.maximum(o, c)
+    body_lo = np.minimum(o, c)
+    wick_out = np.where(side_long, np.maximum(0.0, h - body_hi), np.maximum(0.0, body_lo - l))
+    return wick_out / rng
 
 # =====================================================
 # SIMULATION — SL = STOP_FRAC * box, TP = TP_R × SL
 # =====================================================
-def simulate_trade(
-    day_paris: pd.DataFrame,
+# Codes de sortie renvoyés par le noyau de simulation
+REASON_SL, REASON_TP, REASON_BE, REASON_TIMEOUT = 0, 1, 2, 3
+REASON_NAMES = ("SL", "TP", "BE", "TIMEOUT")
+# Colonne `reason` catégorielle : les filtres reason == "TP" comparent des codes entiers
+REASON_DTYPE = pd.CategoricalDtype(["TP", "SL", "BE", "TIMEOUT"])
+
+@njit(cache=True)
+def _simulate_trail_nb(hi, lo, close, entry, stop, tp, be_trig, enable_be, side_long):
+    """
+    Parcours bougie par bougie depuis la bougie d'entrée (index 0).
+    Retourne (index de sortie, prix de sortie, code de sortie).
+    """
+    n = hi.shape[0]
+    # 1ère bougie d'entrée : seul le SL compte (TP ignoré)
+    if (lo[0] <= stop) if side_long else (hi[0] >= stop):
+        return 0, stop, REASON_SL
+
+    moved = False
+    for i in range(1, n):
+        # (BE off par défaut — si on l’active, TP reste en multiples du risque initial)
+        if enable_be and not moved:
+            if (hi[i] >= be_trig) if side_long else (lo[i] <= be_trig):
+                stop = entry
+                moved = True
+
+        if side_long:
+            if lo[i] <= stop:
+                return i, stop, (REASON_BE if moved else REASON_SL)
+            if hi[i] >= tp:
+                return i, tp, REASON_TP
+        else:
+            if hi[i] >= stop:
+                return i, stop, (REASON_BE if moved else REASON_SL)
+            if lo[i] <= tp:
+                return i, tp, REASON_TP
+
+    return n - 1, close[n - 1], REASON_TIMEOUT
+
+@njit(parallel=True, cache=True)
+def _simulate_batch_nb(hi, lo, close, j0, j1, entry, stop, tp, side_long):
+    """
+    Suivi sans BE de tous les trades en un appel : tableaux complets + bornes [j0 ; j1[ par trade.
+    Retourne (index absolu de sortie, prix de sortie, code de sortie) par trade.
+    """
+    m = j0.shape[0]
+    out_idx = np.empty(m, dtype=np.int64)
+    out_px = np.empty(m, dtype=np.float64)
+    out_code = np.empty(m, dtype=np.int64)
+    for s in prange(m):
+        a, b = j0[s], j1[s]
+        k, px, code = _simulate_trail_nb(hi[a:b], lo[a:b], close[a:b],
+                                         entry[s], stop[s], tp[s], np.inf, False, side_long[s])
+        out_idx[s] = a + k
+        out_px[s] = px
+        out_code[s] = code
+    return out_idx, out_px, out_code
+
+def _paris_ts(ts64: np.datetime64) -> pd.Timestamp:
+    """Horodatage NumPy (UTC) -> Timestamp Paris."""
+    return pd.Timestamp(ts64).tz_localize("UTC").tz_convert(LOCAL_TZ)
+
+def _prepare_trade(
+    day_ts: np.ndarray,
+    day_hi: np.ndarray,
+    day_lo: np.ndarray,
     side: str,
     box_high: float,
     box_low: float,
     break_end_paris: pd.Timestamp,
-    break_date_ny,
+    cutoff_paris: pd.Timestamp,
     break_px: float,
     tp_r: float,
-    be_at_r: float = BE_AT_R,
-    enable_be: bool = ENABLE_BE,
-    overext_mult: float = OVEREXT_MULT,
-    retest_minutes: Optional[int] = None,
-) -> Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]:
+    be_at_r: float,
+    enable_be: bool,
+    overext_mult: float,
+    retest_minutes: Optional[int],
+    stop_frac: float,
+) -> Optional[Tuple[int, int, float, float, float, float, float]]:
     """
-    - Retest STRICTEMENT après la bougie de cassure.
-    - 1ère bougie d'entrée: SL touché => SL, TP-only ignoré.
-    - Overextension avant l'entrée (si OVEREXT_MULT > 0).
-    - SL = STOP_FRAC * hauteur de box depuis l’extrémité côté cassure (vers l’intérieur).
-    - TP = entrée ± TP_R * |entrée − SL|.
+    Entrée (retest + overextension) et niveaux du trade, sans le suivi.
+    Retourne (j0, j1, entry, stop, tp, be_trig, risk_points) — bornes [j0 ; j1[ dans la journée — ou None.
     """
     entry = float(box_high if side == "long" else box_low)
 
-    # ----- SL = STOP_FRAC de la hauteur de la box (vers l'intérieur) -----
+    # ----- SL = stop_frac de la hauteur de la box (vers l'intérieur) -----
     box_h = float(box_high - box_low)
-    sl_dist = max(float(STOP_FRAC) * abs(box_h), 1e-12)
+    sl_dist = max(float(stop_frac) * abs(box_h), 1e-12)
     stop = entry - sl_dist if side == "long" else entry + sl_dist
     # ---------------------------------------------------------------------
 
@@ -181,37 +252,39 @@ def simulate_trade(
     # Fenêtre de retest strictement après la cassure
     rm = int(retest_minutes if retest_minutes is not None else RETEST_MINUTES)
     end = break_end_paris + pd.Timedelta(minutes=rm)
-    w = day_paris[(day_paris.index > break_end_paris) & (day_paris.index < end)]
-    if w.empty:
+    # Index trié : bornes ]break_end ; end[ par recherche binaire, puis tranches sans copie
+    i0 = np.searchsorted(day_ts, break_end_paris.asm8, side="right")
+    i1 = np.searchsorted(day_ts, end.asm8, side="left")
+    if i1 <= i0:
         return None
 
     # Premier toucher du niveau d'entrée
-    hit = w[w["Low"] <= entry] if side == "long" else w[w["High"] >= entry]
-    if hit.empty:
+    w_hi, w_lo = day_hi[i0:i1], day_lo[i0:i1]
+    touch = (w_lo <= entry) if side == "long" else (w_hi >= entry)
+    if not touch.any():
         return None
+    i_hit = int(touch.argmax())
 
-    # Overextension avant l'entrée
-    if overext_mult and overext_mult > 0 and np.isfinite(overext_mult):
+    # Overextension avant l'entrée (extrême des bougies précédant le 1er toucher)
+    if i_hit > 0 and overext_mult and overext_mult > 0 and np.isfinite(overext_mult):
         box_mid_val = (box_high + box_low) / 2.0
         dist_from_mid = abs(float(break_px) - box_mid_val)
         if dist_from_mid > 0:
-            entry_ts_candidate = hit.index[0]
-            pre = w[w.index < entry_ts_candidate]
-            if not pre.empty:
-                if side == "long":
-                    runup = float(pre["High"].max()) - float(break_px)
-                    if runup > overext_mult * dist_from_mid:
-                        return None
-                else:
-                    rundown = float(break_px) - float(pre["Low"].min())
-                    if rundown > overext_mult * dist_from_mid:
-                        return None
-
-    entry_ts = hit.index[0]
-    cutoff_paris = pd.Timestamp(f"{break_date_ny} {MAX_TRADE_END_NY}", tz=EXCHANGE_TZ).tz_convert(LOCAL_TZ)
-
-    trail = day_paris[(day_paris.index >= entry_ts) & (day_paris.index <= cutoff_paris)]
-    if trail.empty:
+            # fmax/fmin ignorent les NaN comme pandas
+            if side == "long":
+                runup = float(np.fmax.reduce(w_hi[:i_hit])) - float(break_px)
+                if runup > overext_mult * dist_from_mid:
+                    return None
+            else:
+                rundown = float(break_px) - float(np.fmin.reduce(w_lo[:i_hit]))
+                if rundown > overext_mult * dist_from_mid:
+                    return None
+
+    j0 = i0 + i_hit
+
+    # Suivi du trade : [entry_ts ; cutoff_paris]
+    j1 = np.searchsorted(day_ts, cutoff_paris.asm8, side="right")
+    if j1 <= j0:
         return None
 
     # TP = TP_R × risk_points (R fixe)
@@ -221,166 +294,301 @@ def simulate_trade(
     else:
         tp = entry - float(tp_r) * risk_points
         be_trig = entry - (be_at_r * risk_points if enable_be else np.inf)
+    return int(j0), int(j1), entry, stop, tp, be_trig, risk_points
 
-    moved = False
-    first_bar = True
-    for ts, row in trail.iterrows():
-        hi, lo = float(row["High"]), float(row["Low"])
-
-        if first_bar:
-            if side == "long":
-                if lo <= stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-            else:
-                if hi >= stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-            first_bar = False
-            continue
-
-        # (BE off par défaut — si on l’active, TP reste en multiples du risque initial)
-        if enable_be and not moved:
-            if (hi >= be_trig) if side == "long" else (lo <= be_trig):
-                stop = entry
-                moved = True
-
-        if side == "long":
-            eff_stop = stop
-            if lo <= eff_stop:
-                return entry_ts, ts, eff_stop, ("BE" if (moved and eff_stop == entry) else "SL"), risk_points
-            if hi >= tp:
-                return entry_ts, ts, tp, "TP", risk_points
-        else:
-            eff_stop = stop
-            if hi >= eff_stop:
-                return entry_ts, ts, eff_stop, ("BE" if (moved and eff_stop == entry) else "SL"), risk_points
-            if lo <= tp:
-                return entry_ts, ts, tp, "TP", risk_points
+def simulate_trade(
+    day_ts: np.ndarray,
+    day_hi: np.ndarray,
+    day_lo: np.ndarray,
+    day_close: np.ndarray,
+    side: str,
+    box_high: float,
+    box_low: float,
+    break_end_paris: pd.Timestamp,
+    cutoff_paris: pd.Timestamp,
+    break_px: float,
+    tp_r: float,
+    be_at_r: float = BE_AT_R,
+    enable_be: bool = ENABLE_BE,
+    overext_mult: float = OVEREXT_MULT,
+    retest_minutes: Optional[int] = None,
+    stop_frac: float = STOP_FRAC,
+) -> Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]:
+    """
+    - Retest STRICTEMENT après la bougie de cassure.
+    - 1ère bougie d'entrée: SL touché => SL, TP-only ignoré.
+    - Overextension avant l'entrée (si OVEREXT_MULT > 0).
+    - SL = STOP_FRAC * hauteur de box depuis l’extrémité côté cassure (vers l’intérieur).
+    - TP = entrée ± TP_R * |entrée − SL|.
+    Journée passée en tableaux : day_ts (datetime64 UTC, trié), day_hi / day_lo / day_close.
+    """
+    prep = _prepare_trade(day_ts, day_hi, day_lo, side, box_high, box_low, break_end_paris,
+                          cutoff_paris, break_px, tp_r, be_at_r, enable_be, overext_mult, retest_minutes,
+                          stop_frac)
+    if prep is None:
+        return None
+    j0, j1, entry, stop, tp, be_trig, risk_points = prep
 
-    return entry_ts, trail.index[-1], float(trail.iloc[-1]["Close"]), "TIMEOUT", risk_points
+    k, exit_px, code = _simulate_trail_nb(
+        np.ascontiguousarray(day_hi[j0:j1]),
+        np.ascontiguousarray(day_lo[j0:j1]),
+        np.ascontiguousarray(day_close[j0:j1]),
+        entry, stop, tp, be_trig, bool(enable_be), side == "long",
+    )
+    return _paris_ts(day_ts[j0]), _paris_ts(day_ts[j0 + k]), float(exit_px), REASON_NAMES[code], risk_points
 
-def body_and_range_pass(side: str, bh: float, bl: float,
-                        o: float, h: float, l: float, c: float,
+def body_and_range_pass(side_long: np.ndarray, bh: np.ndarray, bl: np.ndarray,
+                        o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
                         body_outside_frac_min: float,
-                        range_vs_box_min: float) -> bool:
+                        range_vs_box_min: float) -> np.ndarray:
+    """Filtre corps hors box / range vs box, sur des tableaux de bougies (masque booléen)."""
     # filtres à 0 => toujours True
     if body_outside_frac_min <= 0 and range_vs_box_min <= 0:
-        return True
-    lo_body, hi_body = min(o, c), max(o, c)
-    rng = max(h - l, 1e-12)
-    box_h = max(bh - bl, 1e-12)
-    if side == "long":
-        body_out = max(0.0, hi_body - max(bh, lo_body)) if hi_body > bh else 0.0
-    else:
-        body_out = (min(bl, hi_body) - lo_body) if lo_body < bl else 0.0
-    body_frac = body_out / max(hi_body - lo_body, 1e-12)
+        return np.ones(np.shape(o), dtype=bool)
+    lo_body, hi_body = np.minimum(o, c), np.maximum(o, c)
+    rng = np.maximum(h - l, 1e-12)
+    box_h = np.maximum(bh - bl, 1e-12)
+    body_out = np.where(
+        side_long,
+        np.where(hi_body > bh, np.maximum(0.0, hi_body - np.maximum(bh, lo_body)), 0.0),
+        np.where(lo_body < bl, np.minimum(bl, hi_body) - lo_body, 0.0),
+    )
+    body_frac = body_out / np.maximum(hi_body - lo_body, 1e-12)
     range_frac = rng / box_h
-    return (body_frac >= body_outside_frac_min) and (range_frac >= range_vs_box_min)
+    return (body_frac >= body_outside_frac_min) & (range_frac >= range_vs_box_min)
 
-def build_daily_setups(ohlc_paris: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Box 1h (09:30–10:29 NY) + 1ère cassure BREAK_TF à partir de 10:30 NY.
-       Applique box_min + wick ≤ WICK_OUT_MAX_FRAC (si activés).
+def compute_brk(ohlc_paris: pd.DataFrame, tf: str) -> pd.DataFrame:
     """
-    setups: List[Dict[str, Any]] = []
-    df_brk = (
+    Resample BREAK_TF (left/left, FiveMinAgg).
+    Pour un balayage de paramètres : le calculer une fois et le passer à run_strategy(..., df_brk=...).
+    """
+    return (
         ohlc_paris
-        .resample(BREAK_TF, label="left", closed="left")
+        .resample(tf, label="left", closed="left")
         .agg(FiveMinAgg)
         .dropna()
     )
 
-    for date_paris, day_paris in ohlc_paris.resample("D"):
-        if day_paris.empty:
-            continue
-
-        day_brk = df_brk.loc[day_paris.index.min(): day_paris.index.max()]
-        if day_brk.empty:
-            continue
-
-        # Box 1h (09:30–10:29 NY)
-        day_ny = day_paris.tz_convert(EXCHANGE_TZ)
-        box_ny = day_ny.between_time(OPEN_START_NY, OPEN_END_NY)
-        if box_ny.empty:
-            continue
-
-        bh, bl = float(box_ny["High"].max()), float(box_ny["Low"].min())
-        if not passes_box_filter(bh, bl):
-            continue
-
-        # 1ère clôture BREAK_TF qui sort de la box à partir de 10:30 NY
-        side, bstart_paris, bend_paris, break_px = first_break_close_out(day_brk, bh, bl)
-        if side is None:
-            continue
-
-        # Bougie de cassure (au TF BREAK_TF) pour filtres
-        r = day_brk.loc[bstart_paris]
-        oC, hC, lC, cC = map(float, (r["Open"], r["High"], r["Low"], r["Close"]))
-
-        # Filtres (body/range selon params) + wick
-        if not body_and_range_pass(side, bh, bl, oC, hC, lC, cC,
-                                   BODY_OUTSIDE_FRAC_MIN, RANGE_VS_BOX_MIN):
-            continue
-        wick_frac = outside_wick_frac(side, bh, bl, oC, hC, lC, cC)
-        if wick_frac > float(WICK_OUT_MAX_FRAC):
-            continue
+def build_daily_setups(ohlc_paris: pd.DataFrame, df_brk: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+    """Box 1h (09:30–10:29 NY) + 1ère cassure BREAK_TF à partir de 10:30 NY.
+       Applique box_min + wick ≤ WICK_OUT_MAX_FRAC (si activés).
+       Box et 1ère cassure sont calculées pour toutes les dates NY en une passe (groupby).
+       df_brk : bougies BREAK_TF déjà calculées par l'appelant (compute_brk), sinon calculées ici.
+    """
+    setups: List[Dict[str, Any]] = []
+    if df_brk is None:
+        df_brk = compute_brk(ohlc_paris, BREAK_TF)
+    if df_brk.empty:
+        return setups
+
+    # Box 1h (09:30–10:29 NY), une ligne par date NY — masques horaires HHMM calculés une fois
+    ny_day, ny_hhmm = _ny_hhmm(ohlc_paris.index)
+    box_mask = (ny_hhmm >= _hhmm(OPEN_START_NY)) & (ny_hhmm <= _hhmm(OPEN_END_NY))
+    daily_box = (
+        ohlc_paris[box_mask]
+        .groupby(ny_day[box_mask])
+        .agg(bh=("High", "max"), bl=("Low", "min"))
+    )
+    daily_box = daily_box[[passes_box_filter(bh, bl) for bh, bl in zip(daily_box["bh"], daily_box["bl"])]]
+    if daily_box.empty:
+        return setups
+
+    # Bougies BREAK_TF à partir de 10:30 NY, avec la box de leur journée
+    brk_day, brk_hhmm = _ny_hhmm(df_brk.index)
+    scan_mask = (brk_hhmm >= _hhmm(BREAK_SCAN_START_NY)) & (brk_hhmm <= _hhmm(BREAK_SCAN_END_NY))
+    brk_ny = df_brk[scan_mask].assign(day=brk_day[scan_mask]).join(daily_box, on="day", how="inner")
+    if brk_ny.empty:
+        return setups
+
+    # Colonnes en tableaux NumPy : lecture par position entière, sans .loc
+    brk_vals = brk_ny[["Open", "High", "Low", "Close", "bh", "bl"]].to_numpy(np.float64)
+    brk_days = brk_ny["day"].to_numpy()
+    break_long = brk_vals[:, 3] > brk_vals[:, 4]
+    break_short = brk_vals[:, 3] < brk_vals[:, 5]
+
+    # 1ère clôture BREAK_TF qui sort de la box : 1ère position en cassure de chaque date NY
+    hit_pos = np.flatnonzero(break_long | break_short)
+    if hit_pos.size == 0:
+        return setups
+    first_pos = hit_pos[np.r_[True, np.diff(brk_days[hit_pos]) != 0]]
+
+    # Filtres (body/range selon params) + wick, sur toutes les bougies de cassure à la fois
+    side_long = break_long[first_pos]
+    o5, h5, l5, c5, bh5, bl5 = brk_vals[first_pos].T
+    keep = body_and_range_pass(side_long, bh5, bl5, o5, h5, l5, c5,
+                               BODY_OUTSIDE_FRAC_MIN, RANGE_VS_BOX_MIN)
+    keep &= outside_wick_frac(side_long, bh5, bl5, o5, h5, l5, c5) <= float(WICK_OUT_MAX_FRAC)
+    first_pos = first_pos[keep]
+    bstarts_paris = brk_ny.index[first_pos].tz_convert(LOCAL_TZ)
+
+    # Journée Paris de chaque setup : bornes entières [minuit ; minuit suivant[ dans les tableaux complets
+    all_ts = ohlc_paris.index.values
+    all_hi = ohlc_paris["High"].to_numpy(np.float64)
+    all_lo = ohlc_paris["Low"].to_numpy(np.float64)
+    all_close = ohlc_paris["Close"].to_numpy(np.float64)
+    day_starts = bstarts_paris.normalize()
+    day_lo_pos = np.searchsorted(all_ts, day_starts.values, side="left")
+    day_hi_pos = np.searchsorted(all_ts, (day_starts + pd.DateOffset(days=1)).values, side="left")
+
+    # Fin de suivi (MAX_TRADE_END_NY à la date NY de la cassure), convertie une fois pour tous les setups
+    dates_ny = pd.to_datetime(brk_days[first_pos], unit="D")
+    end_h, end_m = divmod(_hhmm(MAX_TRADE_END_NY), 100)
+    cutoffs_paris = (
+        (dates_ny + pd.Timedelta(hours=end_h, minutes=end_m))
+        .tz_localize(EXCHANGE_TZ)
+        .tz_convert(LOCAL_TZ)
+    )
 
-        trade_date_ny = bstart_paris.tz_convert(EXCHANGE_TZ).date()
+    for pos, bstart_paris, date_ny, cutoff_paris, d0, d1 in zip(
+        first_pos, bstarts_paris, dates_ny.date, cutoffs_paris, day_lo_pos, day_hi_pos
+    ):
+        side = "long" if break_long[pos] else "short"
+        cC, bh, bl = map(float, brk_vals[pos, 3:])
         setups.append(dict(
-            date_paris=date_paris.date(),
-            day_paris=day_paris,
+            date_paris=bstart_paris.date(),
+            day_pos=int(d0),
+            day_ts=all_ts[d0:d1],
+            day_hi=all_hi[d0:d1],
+            day_lo=all_lo[d0:d1],
+            day_close=all_close[d0:d1],
             box_high=bh, box_low=bl,
             side=side,
             break_start=bstart_paris,
-            break_end=bend_paris,
-            break_px=break_px,
-            trade_date_ny=trade_date_ny,
+            break_end=bstart_paris + pd.Timedelta(BREAK_TF),
+            break_px=cC,
+            trade_date_ny=date_ny,
+            cutoff_paris=cutoff_paris,
         ))
     return setups
 
 # =====================================================
 # RUN & REPORTS
 # =====================================================
-def run_strategy(ohlc_paris: pd.DataFrame) -> pd.DataFrame:
-    setups = build_daily_setups(ohlc_paris)
-    rows: List[List[Any]] = []
-
-    for st in setups:
-        sim = simulate_trade(
-            day_paris=st["day_paris"],
-            side=st["side"],
-            box_high=st["box_high"],
-            box_low=st["box_low"],
-            break_end_paris=st["break_end"],
-            break_date_ny=st["trade_date_ny"],
-            break_px=st["break_px"],
-            tp_r=float(TP_R),
-            enable_be=ENABLE_BE,
-            be_at_r=BE_AT_R,
-            overext_mult=float(OVEREXT_MULT),
-            retest_minutes=int(RETEST_MINUTES),
-        )
+def _simulate_kwargs(kwargs: Dict[str, Any]) -> Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]:
+    return simulate_trade(**kwargs)
+
+def _simulate_batch(ohlc_paris: pd.DataFrame, setups: List[Dict[str, Any]],
+                    sim_args: List[Dict[str, Any]]) -> List[Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]]:
+    """Cas sans BE : entrées préparées setup par setup, puis suivi de tous les trades en un seul appel (prange)."""
+    sims: List[Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]] = [None] * len(setups)
+    live: List[int] = []
+    levels: List[Tuple[int, int, float, float, float, float, float]] = []
+    for i, kw in enumerate(sim_args):
+        prep = _prepare_trade(**{k: v for k, v in kw.items() if k != "day_close"})
+        if prep is not None:
+            live.append(i)
+            levels.append(prep)
+    if not live:
+        return sims
+
+    # Bornes ramenées dans les tableaux complets (offset de la journée du setup)
+    day_pos = np.array([setups[i]["day_pos"] for i in live], dtype=np.int64)
+    j0, j1, entry, stop, tp, _, risk = (np.array(col) for col in zip(*levels))
+    side_long = np.array([setups[i]["side"] == "long" for i in live], dtype=np.bool_)
+    all_ts = ohlc_paris.index.values
+    idx, px, code = _simulate_batch_nb(
+        ohlc_paris["High"].to_numpy(np.float64),
+        ohlc_paris["Low"].to_numpy(np.float64),
+        ohlc_paris["Close"].to_numpy(np.float64),
+        day_pos + j0.astype(np.int64), day_pos + j1.astype(np.int64),
+        entry.astype(np.float64), stop.astype(np.float64), tp.astype(np.float64), side_long,
+    )
+    for n, i in enumerate(live):
+        sims[i] = (_paris_ts(all_ts[day_pos[n] + j0[n]]), _paris_ts(all_ts[idx[n]]),
+                   float(px[n]), REASON_NAMES[code[n]], float(risk[n]))
+    return sims
+
+def run_strategy(ohlc_paris: pd.DataFrame, df_brk: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    setups = build_daily_setups(ohlc_paris, df_brk)
+
+    # Chaque setup est indépendant : arguments figés ici, simulation éventuellement répartie sur les cœurs
+    sim_args = [dict(
+        day_ts=st["day_ts"],
+        day_hi=st["day_hi"],
+        day_lo=st["day_lo"],
+        day_close=st["day_close"],
+        side=st["side"],
+        box_high=st["box_high"],
+        box_low=st["box_low"],
+        break_end_paris=st["break_end"],
+        cutoff_paris=st["cutoff_paris"],
+        break_px=st["break_px"],
+        tp_r=float(TP_R),
+        enable_be=ENABLE_BE,
+        be_at_r=BE_AT_R,
+        overext_mult=float(OVEREXT_MULT),
+        retest_minutes=int(RETEST_MINUTES),
+        stop_frac=float(STOP_FRAC),
+    ) for st in setups]
+    n_jobs = (os.cpu_count() or 1) if N_JOBS < 0 else max(1, int(N_JOBS))
+    if not ENABLE_BE:
+        # Sans BE : premier toucher SL/TP, suivi de tous les setups dans un seul noyau parallèle
+        sims = _simulate_batch(ohlc_paris, setups, sim_args)
+    elif n_jobs > 1 and len(sim_args) >= PARALLEL_MIN_SETUPS:
+        # "spawn" : si un run sans BE a déjà lancé le noyau parallèle dans ce process (balayage de paramètres),
+        # le pool de threads numba ne survit pas à un fork
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")) as ex:
+            sims = list(ex.map(_simulate_kwargs, sim_args, chunksize=64))
+    else:
+        sims = [_simulate_kwargs(kw) for kw in sim_args]
+
+    # Colonnes pré-allouées (une case par setup), remplies puis filtrées par `valid`
+    n = len(setups)
+    valid = np.zeros(n, dtype=bool)
+    cols: Dict[str, np.ndarray] = {
+        "date": np.empty(n, dtype=object),
+        "side": np.empty(n, dtype=object),
+        "entry_ts": np.empty(n, dtype="datetime64[ns]"),
+        "entry": np.empty(n, dtype=np.float64),
+        "box_high": np.empty(n, dtype=np.float64),
+        "box_low": np.empty(n, dtype=np.float64),
+        "break_end": np.empty(n, dtype="datetime64[ns]"),
+        "exit_ts": np.empty(n, dtype="datetime64[ns]"),
+        "exit_px": np.empty(n, dtype=np.float64),
+        "reason": np.empty(n, dtype=object),
+        "R": np.empty(n, dtype=np.float64),
+    }
+    for i, (st, sim) in enumerate(zip(setups, sims)):
         if not sim:
             continue
 
         entry_ts, exit_ts, exit_px, reason, risk_pts = sim
         entry = st["box_high"] if st["side"] == "long" else st["box_low"]
         R = ((exit_px - entry) / risk_pts) if st["side"] == "long" else ((entry - exit_px) / risk_pts)
-        rows.append([
-            st["date_paris"], st["side"], entry_ts, float(entry),
-            float(st["box_high"]), float(st["box_low"]),
-            st["break_end"], exit_ts, float(exit_px), reason, float(R)
-        ])
-
-    trades = pd.DataFrame(rows, columns=[
-        "date", "side", "entry_ts", "entry", "box_high", "box_low",
-        "break_end", "exit_ts", "exit_px", "reason", "R"
-    ])
+        valid[i] = True
+        cols["date"][i] = st["date_paris"]
+        cols["side"][i] = st["side"]
+        cols["entry_ts"][i] = entry_ts.asm8
+        cols["entry"][i] = entry
+        cols["box_high"][i] = st["box_high"]
+        cols["box_low"][i] = st["box_low"]
+        cols["break_end"][i] = st["break_end"].asm8
+        cols["exit_ts"][i] = exit_ts.asm8
+        cols["exit_px"][i] = exit_px
+        cols["reason"][i] = reason
+        cols["R"][i] = R
+
+    # Tri par sortie sur les colonnes brutes : le DataFrame est construit déjà ordonné (pas de copie triée)
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(cols["exit_ts"][order], kind="stable")]
+    trades = pd.DataFrame({k: v[order] for k, v in cols.items()})
     if trades.empty:
         return trades
+    # Horodatages stockés en UTC (datetime64) -> Paris
+    for k in ("entry_ts", "break_end", "exit_ts"):
+        trades[k] = trades[k].dt.tz_localize("UTC").dt.tz_convert(LOCAL_TZ)
+    trades["reason"] = trades["reason"].astype(REASON_DTYPE)
 
-    trades = trades.sort_values("exit_ts").copy()
-    trades["cum_R"] = trades["R"].cumsum()
+    trades["cum_R"] = trades["R"].to_numpy().cumsum()
     return trades
 
+def _max_drawdown_r(r: Any) -> float:
+    """Max drawdown (en R) d'une suite de résultats ordonnée par sortie."""
+    cum = np.cumsum(np.asarray(r, dtype=np.float64))
+    if cum.size == 0:
+        return 0.0
+    return float((np.maximum.accumulate(cum) - cum).max())
+
 def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataFrame:
     if trades.empty:
         return pd.DataFrame([[0,0,0,0,0.0,0.0,0.0,0.0,0.0]], columns=[
@@ -395,7 +603,7 @@ def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataF
     winrate = (tp_c / n) * 100.0
     r_mean = float(t["R"].mean())
     r_total = float(t["R"].sum())
-    max_dd = float((t["cum_R"].cummax() - t["cum_R"]).max())
+    max_dd = _max_drawdown_r(t["R"].to_numpy())
 
     nb_days = (ohlc_paris.index.date.max() - ohlc_paris.index.date.min()).days + 1
     trades_per_day = (n / nb_days) if nb_days > 0 else 0.0
@@ -407,36 +615,38 @@ def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataF
 
 def summarize_monthly_2025(trades: pd.DataFrame) -> pd.DataFrame:
     t = trades.copy()
+    # entry_ts est déjà tz-aware : une seule conversion, réutilisée pour le mois et l'année
+    ent_local = t["entry_ts"].dt.tz_convert(LOCAL_TZ)
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=UserWarning)
-        t["month"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.to_period("M").astype(str)
-    t["year"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.year
+        t["month"] = ent_local.dt.to_period("M").astype(str)
+    t["year"] = ent_local.dt.year
     t25 = t[t["year"] == 2025]
     if t25.empty:
         return pd.DataFrame(columns=["month", "Trades", "TP", "SL", "TIMEOUT", "Winrate_%", "R_mean", "R_total", "Max_DD_R"])
 
-    rows = []
-    for m, g in t25.groupby("month"):
-        g = g.sort_values("exit_ts")
-        cum = g["R"].cumsum()
-        rows.append([
-            m,
-            len(g),
-            int((g["reason"] == "TP").sum()),
-            int((g["reason"] == "SL").sum()),
-            int((g["reason"] == "TIMEOUT").sum()),
-            float(g["reason"].eq("TP").mean() * 100.0),
-            float(g["R"].mean()),
-            float(g["R"].sum()),
-            float((cum.cummax() - cum).max()),
-        ])
-    monthly = pd.DataFrame(rows, columns=["month", "Trades", "TP", "SL", "TIMEOUT", "Winrate_%", "R_mean", "R_total", "Max_DD_R"]).sort_values("month").reset_index(drop=True)
-    return monthly
+    # Agrégats mensuels en un seul groupby (trades triés par sortie => Max_DD_R par mois)
+    t25 = t25.sort_values("exit_ts").assign(
+        is_tp=t25["reason"].eq("TP"),
+        is_sl=t25["reason"].eq("SL"),
+        is_to=t25["reason"].eq("TIMEOUT"),
+    )
+    monthly = t25.groupby("month").agg(
+        Trades=("R", "size"),
+        TP=("is_tp", "sum"),
+        SL=("is_sl", "sum"),
+        TIMEOUT=("is_to", "sum"),
+        R_mean=("R", "mean"),
+        R_total=("R", "sum"),
+        Max_DD_R=("R", _max_drawdown_r),
+    )
+    monthly.insert(4, "Winrate_%", monthly["TP"] / monthly["Trades"] * 100.0)
+    return monthly.reset_index()
 
 def make_last_10(trades: pd.DataFrame) -> pd.DataFrame:
     t = trades.sort_values("exit_ts").tail(10).copy()
-    t["entry_time"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
-    t["exit_time"] = pd.to_datetime(t["exit_ts"]).dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
+    t["entry_time"] = t["entry_ts"].dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
+    t["exit_time"] = t["exit_ts"].dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
     out = t[["date", "side", "entry_time", "entry", "exit_time", "exit_px", "reason", "R"]].copy()
     return out
 
@@ -472,20 +682,22 @@ if __name__ == "__main__":
         print("\n=== 10 derniers trades ===")
         print(last10.to_string(index=False))
 
-        # Courbe d'équité
-        plt.figure(figsize=(9, 4))
-        t_sorted = trades.sort_values("exit_ts")
-        plt.plot(t_sorted["exit_ts"], t_sorted["cum_R"])
-        plt.title(f"Équité cumulée (R) — Cassure {BREAK_TF} | SL={int(STOP_FRAC*100)}% box | TP={TP_R}R")
-        plt.xlabel("Date")
-        plt.ylabel("R cumulés")
-        plt.grid(True)
-        plt.tight_layout()
-        if SAVE_PLOTS:
-            plt.savefig("opr_equity_curve.png", dpi=PLOT_DPI)
-        if SHOW_PLOTS:
-            plt.show()
-        else:
-            plt.close()
+        # Courbe d'équité (construite seulement si elle est sauvegardée ou affichée)
+        if SAVE_PLOTS or SHOW_PLOTS:
+            # trades est déjà trié par exit_ts (run_strategy) ; heure Paris en datetime64 naïf pour matplotlib
+            plt.figure(figsize=(9, 4))
+            plt.plot(trades["exit_ts"].dt.tz_localize(None).to_numpy(), trades["cum_R"].to_numpy())
+            plt.title(f"Équité cumulée (R) — Cassure {BREAK_TF} | SL={int(STOP_FRAC*100)}% box | TP={TP_R}R")
+            plt.xlabel("Date")
+            plt.ylabel("R cumulés")
+            plt.grid(True)
+            plt.tight_layout()
+            if SAVE_PLOTS:
+                plt.savefig("opr_equity_curve.png", dpi=PLOT_DPI)
+            if SHOW_PLOTS:
+                plt.show()
+            else:
+                plt.close()
 
-        print("\nFichiers sauvegardés : opr_trades.csv, opr_global_summary.csv, opr_monthly_2025.csv, opr_last10.csv, opr_equity_curve.png")
+        saved = "opr_trades.csv, opr_global_summary.csv, opr_monthly_2025.csv, opr_last10.csv"
+        print(f"\nFichiers sauvegardés : {saved}" + (", opr_equity_curve.png" if SAVE_PLOTS else ""))
@@ -2,16 +2,59 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import contextlib
 import csv
 import io
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta, time
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field, fields
+from datetime import date, datetime, timedelta, time
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import zipfile
 
+import numpy as np
 from zoneinfo import ZoneInfo
 
+try:
+    import pandas as pd
+
+    HAVE_PANDAS = True
+except ImportError:  # pragma: no cover - optional dependency, falls back to the csv module loader
+    pd = None
+    HAVE_PANDAS = False
+
+try:
+    import polars as pl
+
+    HAVE_POLARS = True
+except ImportError:  # pragma: no cover - optional dependency, only used when asked for (--polars)
+    pl = None
+    HAVE_POLARS = False
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - optional dependency, kernels then run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    # Ahead-of-time build of _simulate_day (see --build-kernel): no JIT compilation at start-up
+    from trade_kernel_4h import simulate_day as _simulate_day_aot
+except ImportError:  # pragma: no cover - optional build artefact, the JIT / Python kernel is used instead
+    _simulate_day_aot = None
+
+# Kernel arguments stay NumPy arrays for compiled kernels, plain lists for the Python fallback
+HAVE_COMPILED_KERNEL = HAVE_NUMBA or _simulate_day_aot is not None
+
 UTC = ZoneInfo("UTC")
 NY_TZ = ZoneInfo("America/New_York")
 
@@ -27,6 +70,8 @@ RR_END = 3.0
 RR_STEP = 0.1
 MIN_AVG_R = 0.12
 MIN_TRADES = 100
+CHUNK_LINES = 250_000  # minute rows per parsed block in iter_day_data (about eight months of NQ)
+WORKERS = 1  # processes used for the RR sweep (0 = one per CPU core)
 
 # Trade limits (None = disabled)
 MAX_TRADES_PER_DAY: Optional[int] = None
@@ -47,33 +92,47 @@ MAX_RETEST_SIZE_PCT: Optional[float] = None
 MIN_RETEST_BODY_INSIDE_PCT: Optional[float] = 0.3
 
 
-@dataclass
-class MinuteBar:
-    time: datetime
-    open: float
-    high: float
-    low: float
-    close: float
-
-
-@dataclass
-class Bar:
-    time: datetime
-    open: float
-    high: float
-    low: float
-    close: float
+# NQ prices are multiples of 0.25 well below 2**22, so float32 holds them exactly at half the size
+PRICE_DTYPE = np.float32
 
 
-@dataclass
+@dataclass(slots=True)
 class DayData:
+    """One New York trading day: 4h range plus its 5-minute bars as column arrays."""
+
     day_start: datetime
     range_high: float
     range_low: float
-    bars: List[Bar]
-
-
-@dataclass
+    time_ns: np.ndarray  # int64 nanoseconds since the epoch (UTC)
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    _scan: Optional["_DayScan"] = field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class _DayScan:
+    """RR-independent views of a day for the bar-by-bar state machine (built once, reused per RR)."""
+
+    start: int  # first bar at or after the end of the 4h range
+    # Arrays for the Numba kernel, plain lists when it runs as Python (faster scalar indexing)
+    time_ns: Sequence[int]
+    highs: Sequence[float]
+    lows: Sequence[float]
+    closes: Sequence[float]
+    above: Sequence[bool]
+    inside: Sequence[bool]
+    next_out: Sequence[int]  # next_out[i]: first bar >= i closing outside the range (n if none)
+    next_not_above: Sequence[int]  # first bar >= i not closing above the range
+    next_not_below: Sequence[int]  # first bar >= i not closing below the range
+    # Flattened (levels x n) running max of highs / min of lows over [i, i + 2**k): exit bars are
+    # found by binary lifting instead of walking the trade bar by bar for every RR
+    high_table: Sequence[float]
+    low_table: Sequence[float]
+
+
+@dataclass(slots=True)
 class TradeResult:
     day: datetime
     direction: str
@@ -88,90 +147,357 @@ class TradeResult:
     exit_reason: str
 
 
-class FiveMinuteBuilder:
-    def __init__(self) -> None:
-        self.bars: List[Bar] = []
-        self.current_start: Optional[datetime] = None
-        self.current_end: Optional[datetime] = None
-        self.open_price: Optional[float] = None
-        self.high: Optional[float] = None
-        self.low: Optional[float] = None
-        self.close: Optional[float] = None
-        self.last_time: Optional[datetime] = None
-
-    def add(self, bar: MinuteBar) -> None:
-        if self.current_start is None:
-            self.current_start = bar.time.replace(
-                minute=(bar.time.minute // 5) * 5, second=0, microsecond=0
-            )
-            self.current_end = self.current_start + timedelta(minutes=5)
+def _trading_day_start(ts: datetime) -> datetime:
+    return datetime.combine(ts.date(), time(0), tzinfo=NY_TZ)
 
-        while self.current_end is not None and bar.time >= self.current_end:
-            self._flush()
-            self.current_start = self.current_end
-            self.current_end = self.current_start + timedelta(minutes=5)
 
-        if self.open_price is None:
-            self.open_price = bar.open
-            self.high = bar.high
-            self.low = bar.low
-        else:
-            self.high = max(self.high, bar.high)  # type: ignore[arg-type]
-            self.low = min(self.low, bar.low)  # type: ignore[arg-type]
-        self.close = bar.close
-        self.last_time = bar.time
-
-    def finalize(self) -> List[Bar]:
-        self._flush()
-        return self.bars
-
-    def _flush(self) -> None:
-        if self.open_price is None or self.last_time is None:
-            return
-        self.bars.append(
-            Bar(
-                time=self.last_time,
-                open=self.open_price,
-                high=self.high if self.high is not None else self.open_price,
-                low=self.low if self.low is not None else self.open_price,
-                close=self.close if self.close is not None else self.open_price,
-            )
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _to_ns(ts: datetime) -> int:
+    return (ts - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(ns: int) -> datetime:
+    # Bar times are only turned back into datetimes for emitted trades
+    seconds, rest = divmod(ns, 1_000_000_000)
+    ts = datetime.fromtimestamp(seconds, NY_TZ)
+    return ts.replace(microsecond=rest // 1000) if rest else ts
+
+
+def _day_scan(day: DayData) -> _DayScan:
+    if day._scan is None:
+        n = len(day.time_ns)
+        # Close-vs-range masks for the whole day in one pass each
+        above = day.close > day.range_high
+        below = day.close < day.range_low
+        inside = ~(above | below)
+        # The three "next bar where the mask is true" tables in one reversed running minimum,
+        # with a sentinel column so every row ends at n
+        marks = np.full((3, n + 1), n)
+        marks[0, :n][~inside] = np.flatnonzero(~inside)
+        marks[1, :n][~above] = np.flatnonzero(~above)
+        marks[2, :n][~below] = np.flatnonzero(~below)
+        next_out, next_not_above, next_not_below = np.minimum.accumulate(marks[:, ::-1], axis=1)[:, ::-1]
+
+        view = (lambda arr: arr) if HAVE_COMPILED_KERNEL else np.ndarray.tolist
+        range_end = day.day_start + timedelta(hours=4)
+        day._scan = _DayScan(
+            start=int(np.searchsorted(day.time_ns, _to_ns(range_end), side="left")),
+            time_ns=view(day.time_ns),
+            highs=view(day.high),
+            lows=view(day.low),
+            closes=view(day.close),
+            above=view(above),
+            inside=view(inside),
+            next_out=view(np.ascontiguousarray(next_out)),
+            next_not_above=view(np.ascontiguousarray(next_not_above)),
+            next_not_below=view(np.ascontiguousarray(next_not_below)),
+            high_table=view(_block_table(day.high, np.maximum)),
+            low_table=view(_block_table(day.low, np.minimum)),
         )
-        self.open_price = None
-        self.high = None
-        self.low = None
-        self.close = None
+    return day._scan
+
+
+def _block_table(values: np.ndarray, reduce: np.ufunc) -> np.ndarray:
+    """Flat table whose entry k * n + i reduces values[i : i + 2**k] (clipped at n), for k < n.bit_length()."""
+    n = len(values)
+    levels = max(1, n.bit_length())
+    table = np.empty((levels, n), dtype=values.dtype)
+    table[0] = values
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        table[k] = table[k - 1]
+        reduce(table[k - 1, :-half], table[k - 1, half:], out=table[k, :-half])
+    return table.ravel()
+
+
+def _five_minute_bars(
+    keys: np.ndarray,
+    times: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Aggregate consecutive minutes sharing a 5-minute bucket key (bar time = last minute of the bucket)."""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return (
+        times[ends],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+    )
 
 
-def _trading_day_start(ts: datetime) -> datetime:
-    return datetime.combine(ts.date(), time(0), tzinfo=NY_TZ)
+# One parsed minute in the fallback loader: (raw UTC time field, 5-minute bucket key, open, high, low, close)
+MinuteRow = Tuple[bytes, int, float, float, float, float]
+
+
+def _make_day(day_start: datetime, range_high: float, range_low: float, minutes: List[MinuteRow]) -> DayData:
+    raw_times, keys, opens, highs, lows, closes = zip(*minutes)
+    time_ns, open_, high, low, close = _five_minute_bars(
+        np.array(keys, dtype=np.int64),
+        # NumPy parses the ISO time strings of the whole day in C
+        np.array(raw_times).astype("datetime64[ns]").view(np.int64),
+        np.array(opens, dtype=PRICE_DTYPE),
+        np.array(highs, dtype=PRICE_DTYPE),
+        np.array(lows, dtype=PRICE_DTYPE),
+        np.array(closes, dtype=PRICE_DTYPE),
+    )
+    return DayData(
+        day_start=day_start,
+        range_high=range_high,
+        range_low=range_low,
+        time_ns=time_ns,
+        open=open_,
+        high=high,
+        low=low,
+        close=close,
+    )
+
 
+def load_day_data(data_dir: Path, use_polars: bool = False) -> List[DayData]:
+    with _open_minute_csv(data_dir) as handle:
+        return _parse_day_data(handle, use_polars)
 
-def load_day_data(data_dir: Path) -> List[DayData]:
+
+def load_day_data_polars(data_dir: Path) -> List[DayData]:
+    """Same days as load_day_data, parsed with polars' multithreaded CSV reader."""
+    return load_day_data(data_dir, use_polars=True)
+
+
+def iter_day_data(data_dir: Path, chunk_lines: int = CHUNK_LINES, use_polars: bool = False) -> Iterator[DayData]:
+    """Yield the days one by one, parsing the CSV in blocks of whole New York dates.
+
+    Only one block of raw lines and its days are held at a time, instead of the full history.
+    """
+    with _open_minute_csv(data_dir) as handle:
+        header = handle.readline()
+        carry: List[bytes] = []
+        while True:
+            block = list(itertools.islice(handle, chunk_lines))
+            if not block:
+                break
+            lines = carry + block
+            # The last date of the block may continue in the next one: keep its rows for later
+            cut = _last_date_start(lines)
+            carry = lines[cut:]
+            if cut:
+                yield from _parse_day_data(io.BytesIO(header + b"".join(lines[:cut])), use_polars)
+        if carry:
+            yield from _parse_day_data(io.BytesIO(header + b"".join(carry)), use_polars)
+
+
+def _last_date_start(lines: Sequence[bytes]) -> int:
+    """Index of the first row of the trailing New York date run (0 if every row belongs to it)."""
+    last_date: Optional[date] = None
+    for i in range(len(lines) - 1, -1, -1):
+        row = lines[i].split(b";")
+        if len(row) < 6:
+            continue
+        try:
+            dt_ny = datetime.fromisoformat(row[5].decode("ascii")).replace(tzinfo=UTC).astimezone(NY_TZ)
+        except ValueError:
+            continue
+        if last_date is None:
+            last_date = dt_ny.date()
+        elif dt_ny.date() != last_date:
+            return i + 1
+    return 0
+
+
+@contextlib.contextmanager
+def _open_minute_csv(data_dir: Path) -> Iterator[BinaryIO]:
     csv_path = data_dir / "NQ10.csv"
     if csv_path.exists():
-        with csv_path.open("r", newline="") as handle:
-            return _read_day_data(handle)
+        with csv_path.open("rb") as handle:
+            yield handle
+        return
 
     parts = sorted(data_dir.glob("NQ10.zip.part*"))
     if not parts:
         raise FileNotFoundError("No NQ10.csv or NQ10.zip.part* files found")
 
-    combined = io.BytesIO()
-    for part in parts:
-        combined.write(part.read_bytes())
-    combined.seek(0)
+    # The parts are read in place as one seekable stream instead of being joined in memory
+    with io.BufferedReader(ConcatStream(parts), buffer_size=1 << 20) as combined:
+        with zipfile.ZipFile(combined) as archive:
+            with archive.open("NQ10.csv") as handle:
+                yield handle
 
-    with zipfile.ZipFile(combined) as archive:
-        with archive.open("NQ10.csv") as handle:
-            text = io.TextIOWrapper(handle, encoding="utf-8")
-            return _read_day_data(text)
 
+class ConcatStream(io.RawIOBase):
+    """Read-only, seekable stream over several files laid end to end (split zip archive)."""
+
+    def __init__(self, paths: Sequence[Path]) -> None:
+        super().__init__()
+        self._handles = [path.open("rb") for path in paths]
+        # _starts[i]: offset of part i in the virtual file, _starts[-1]: total size
+        self._starts = list(itertools.accumulate((path.stat().st_size for path in paths), initial=0))
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
 
-def _read_day_data(handle: io.TextIOBase) -> List[DayData]:
-    reader = csv.reader(handle, delimiter=";")
-    header = next(reader, None)
-    if header is None:
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._starts[-1] + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        if self._pos >= self._starts[-1]:
+            return 0
+        part = bisect.bisect_right(self._starts, self._pos) - 1
+        handle = self._handles[part]
+        handle.seek(self._pos - self._starts[part])
+        size = min(len(buffer), self._starts[part + 1] - self._pos)
+        read = handle.readinto(memoryview(buffer)[:size])
+        self._pos += read
+        return read
+
+    def close(self) -> None:
+        for handle in self._handles:
+            handle.close()
+        super().close()
+
+
+def _parse_day_data(handle: BinaryIO, use_polars: bool = False) -> List[DayData]:
+    if use_polars:
+        if not HAVE_POLARS:
+            raise RuntimeError("polars is not installed")
+        return _read_day_data_polars(handle)
+    if HAVE_PANDAS:
+        return _read_day_data_pandas(handle)
+    return _read_day_data(handle)
+
+
+def _read_day_data_pandas(handle: BinaryIO) -> List[DayData]:
+    """Vectorized loader: C CSV parser, 4h range per day via groupby, 5-minute bars via reduceat."""
+    frame = pd.read_csv(handle, sep=";", header=0, usecols=[0, 1, 2, 4, 5], engine="c", encoding="utf-8")
+    frame.columns = ["close", "high", "low", "open", "time"]
+    for column in ("close", "high", "low", "open"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    frame = frame.dropna(subset=["close", "high", "low", "open"])
+    if frame.empty:
+        return []
+
+    times_utc = pd.to_datetime(frame["time"], format="%Y-%m-%d %H:%M:%S.%f", utc=True)
+    # New York wall clock drives the day split, the 4h window and the 5-minute buckets
+    local = times_utc.dt.tz_convert(NY_TZ).dt.tz_localize(None)
+    local_day = local.dt.normalize()
+    # Consecutive rows of the same New York date form one trading day
+    frame["day"] = (local_day != local_day.shift()).cumsum()
+
+    in_range = (local - local_day) < pd.Timedelta(hours=4)
+    ranges = frame[in_range].groupby("day").agg(range_high=("high", "max"), range_low=("low", "min"))
+    first_local = local_day.groupby(frame["day"]).first()
+    return _days_from_minutes(
+        frame["day"].to_numpy(),
+        local.to_numpy(dtype="datetime64[ns]").view(np.int64),
+        times_utc.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64),
+        [frame[column].to_numpy(dtype=PRICE_DTYPE) for column in ("open", "high", "low", "close")],
+        ranges={key: (float(high), float(low)) for key, high, low in ranges.itertuples()},
+        day_dates={key: ts.date() for key, ts in first_local.items()},
+    )
+
+
+def _read_day_data_polars(handle: BinaryIO) -> List[DayData]:
+    """Polars loader: multithreaded CSV parser and expressions, same day / range / bar rules as pandas."""
+    prices = ["close", "high", "low", "open"]
+    raw = pl.read_csv(handle, separator=";", columns=[0, 1, 2, 4, 5], infer_schema=False)
+    raw.columns = [*prices, "time"]
+    frame = (
+        raw.lazy()
+        .with_columns(pl.col(prices).cast(pl.Float64, strict=False))
+        .drop_nulls(prices)
+        .with_columns(utc=pl.col("time").str.strptime(pl.Datetime("ns"), "%Y-%m-%d %H:%M:%S%.f"))
+        # New York wall clock drives the day split, the 4h window and the 5-minute buckets
+        .with_columns(
+            local=pl.col("utc")
+            .dt.replace_time_zone("UTC")
+            .dt.convert_time_zone(NY_TZ.key)
+            .dt.replace_time_zone(None)
+        )
+        .with_columns(local_day=pl.col("local").dt.truncate("1d"))
+        .with_columns(
+            # Consecutive rows of the same New York date form one trading day
+            day=(pl.col("local_day") != pl.col("local_day").shift()).fill_null(True).cum_sum(),
+            in_range=(pl.col("local") - pl.col("local_day")) < pl.duration(hours=4),
+        )
+        .collect()
+    )
+    if frame.is_empty():
+        return []
+
+    ranges = frame.filter(pl.col("in_range")).group_by("day").agg(pl.col("high").max(), pl.col("low").min())
+    first_local = frame.group_by("day").agg(pl.col("local_day").first())
+    return _days_from_minutes(
+        frame["day"].to_numpy(),
+        frame["local"].to_numpy().view(np.int64),
+        frame["utc"].to_numpy().view(np.int64),
+        [frame[column].to_numpy().astype(PRICE_DTYPE) for column in ("open", "high", "low", "close")],
+        ranges={key: (high, low) for key, high, low in ranges.iter_rows()},
+        day_dates={key: ts.date() for key, ts in first_local.iter_rows()},
+    )
+
+
+def _days_from_minutes(
+    day_id: np.ndarray,
+    local_ns: np.ndarray,
+    utc_ns: np.ndarray,
+    prices: Sequence[np.ndarray],
+    ranges: Dict[int, Tuple[float, float]],
+    day_dates: Dict[int, date],
+) -> List[DayData]:
+    """Cut time-ordered minutes (open, high, low, close columns) into DayData, skipping days without a 4h range."""
+    # 5-minute buckets of the New York wall clock (a bucket never spans two dates)
+    keys = local_ns // (5 * 60 * 1_000_000_000)
+    bar_times, bar_open, bar_high, bar_low, bar_close = _five_minute_bars(keys, utc_ns, *prices)
+    bar_day = day_id[np.r_[np.flatnonzero(keys[1:] != keys[:-1]), len(keys) - 1]]
+
+    days: List[DayData] = []
+    bounds = np.flatnonzero(np.diff(bar_day)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(bar_day)]):
+        key = int(bar_day[lo])
+        if key not in ranges:
+            continue
+        range_high, range_low = ranges[key]
+        days.append(
+            DayData(
+                day_start=datetime.combine(day_dates[key], time(0), tzinfo=NY_TZ),
+                range_high=range_high,
+                range_low=range_low,
+                time_ns=bar_times[lo:hi],
+                open=bar_open[lo:hi],
+                high=bar_high[lo:hi],
+                low=bar_low[lo:hi],
+                close=bar_close[lo:hi],
+            )
+        )
+    return days
+
+
+def _read_day_data(handle: BinaryIO) -> List[DayData]:
+    """Loader without pandas: fixed unquoted schema, so raw byte lines are split directly."""
+    header = handle.readline()
+    if not header:
         return []
 
     days: List[DayData] = []
@@ -179,24 +505,26 @@ def _read_day_data(handle: io.TextIOBase) -> List[DayData]:
     range_high: Optional[float] = None
     range_low: Optional[float] = None
     range_deadline: Optional[datetime] = None
-    builder = FiveMinuteBuilder()
+    minutes: List[MinuteRow] = []
 
-    for row in reader:
+    for line in handle:
+        row = line.split(b";")
         if len(row) < 6:
             continue
         try:
+            # float() parses ASCII bytes as is, no text decoding of the whole file
             close = float(row[0])
             high = float(row[1])
             low = float(row[2])
             open_price = float(row[4])
-            time_str = row[5]
         except ValueError:
             continue
 
-        dt_utc = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=UTC)
-        dt_ny = dt_utc.astimezone(NY_TZ)
-        bar = MinuteBar(time=dt_ny, open=open_price, high=high, low=low, close=close)
-        day_start = _trading_day_start(bar.time)
+        # "YYYY-MM-DD HH:MM:SS.fff" is ISO 8601: fromisoformat is C code, unlike strptime
+        time_raw = row[5]
+        dt_naive = datetime.fromisoformat(time_raw.decode("ascii"))
+        dt_ny = dt_naive.replace(tzinfo=UTC).astimezone(NY_TZ)
+        day_start = _trading_day_start(dt_ny)
 
         if current_day_start is None:
             current_day_start = day_start
@@ -204,50 +532,57 @@ def _read_day_data(handle: io.TextIOBase) -> List[DayData]:
             range_low = float("inf")
             range_deadline = current_day_start + timedelta(hours=4)
         elif day_start != current_day_start:
-            day_bars = builder.finalize()
-            if range_high is not None and range_high != float("-inf") and day_bars:
+            if range_high is not None and range_high != float("-inf") and minutes:
                 days.append(
-                    DayData(
-                        day_start=current_day_start,
-                        range_high=range_high,
-                        range_low=range_low if range_low is not None else range_high,
-                        bars=day_bars,
+                    _make_day(
+                        current_day_start,
+                        range_high,
+                        range_low if range_low is not None else range_high,
+                        minutes,
                     )
                 )
-            builder = FiveMinuteBuilder()
+            minutes = []
             current_day_start = day_start
             range_high = float("-inf")
             range_low = float("inf")
             range_deadline = current_day_start + timedelta(hours=4)
 
-        if range_deadline is not None and bar.time < range_deadline:
-            range_high = max(range_high, bar.high) if range_high is not None else bar.high
-            range_low = min(range_low, bar.low) if range_low is not None else bar.low
+        if range_deadline is not None and dt_ny < range_deadline:
+            range_high = max(range_high, high) if range_high is not None else high
+            range_low = min(range_low, low) if range_low is not None else low
 
-        builder.add(bar)
+        # 5-minute bucket of the New York wall clock
+        minutes.append(
+            (time_raw, (dt_ny.hour * 60 + dt_ny.minute) // 5, open_price, high, low, close)
+        )
 
     if current_day_start is not None:
-        day_bars = builder.finalize()
-        if range_high is not None and range_high != float("-inf") and day_bars:
+        if range_high is not None and range_high != float("-inf") and minutes:
             days.append(
-                DayData(
-                    day_start=current_day_start,
-                    range_high=range_high,
-                    range_low=range_low if range_low is not None else range_high,
-                    bars=day_bars,
+                _make_day(
+                    current_day_start,
+                    range_high,
+                    range_low if range_low is not None else range_high,
+                    minutes,
                 )
             )
 
     return days
 
 
-def generate_trade_log(
-    days: List[DayData],
-    rr: float,
+@dataclass(slots=True)
+class DaySignals:
+    """Breakout/retest filter results of one day for a given filter set (independent of the RR)."""
+
+    day: DayData
+    breakout_up: Sequence[bool]  # a close above the range would open a pending breakout
+    breakout_down: Sequence[bool]  # a close below the range would open a pending breakout
+    retest_ok: Sequence[bool]  # a close back inside passes the retest candle filters
+
+
+def detect_signals(
+    days: Iterable[DayData],
     min_year: int = 2010,
-    max_trades_per_day: Optional[int] = None,
-    max_trades_per_direction: Optional[int] = None,
-    max_reentry_minutes: Optional[int] = None,
     min_breakout_pct: float = 0.0,
     min_breakout_wick_pct: Optional[float] = None,
     min_box_size: Optional[float] = None,
@@ -255,325 +590,492 @@ def generate_trade_log(
     min_retest_size_pct: Optional[float] = None,
     max_retest_size_pct: Optional[float] = None,
     min_retest_body_inside_pct: Optional[float] = None,
-) -> List[TradeResult]:
-    trades: List[TradeResult] = []
-
+) -> List[DaySignals]:
+    """Select the tradable days and evaluate every RR-independent filter on all their bars at once."""
+    signals: List[DaySignals] = []
     for day in days:
         if day.day_start.year < min_year:
             continue
 
-        range_high = day.range_high
-        range_low = day.range_low
-        pending_breakout: Optional[dict] = None
-        active_trade: Optional[dict] = None
-        range_end = day.day_start + timedelta(hours=4)
-        range_size = range_high - range_low
+        range_size = day.range_high - day.range_low
         if min_box_size is not None and range_size < min_box_size:
             continue
         if max_box_size is not None and range_size > max_box_size:
             continue
-        trades_taken = 0
-        direction_counts = {"long": 0, "short": 0}
-
-        for bar in day.bars:
-            if bar.time < range_end:
-                continue
 
-            if active_trade is not None:
-                if bar.time > active_trade["entry_time"]:
-                    action, info = _check_trade_exit(bar, active_trade)
-                    if action == "exit":
-                        trades.append(
-                            TradeResult(
-                                day=day.day_start,
-                                direction=active_trade["direction"],
-                                entry_time=active_trade["entry_time"],
-                                entry_price=active_trade["entry_price"],
-                                stop_price=active_trade["stop_price"],
-                                target_price=active_trade["target_price"],
-                                exit_time=bar.time,
-                                exit_price=info["price"],
-                                rr=rr,
-                                pnl_r=info["pnl_r"],
-                                exit_reason=info["reason"],
-                            )
-                        )
-                        active_trade = None
-                    elif action == "cancel":
-                        direction_counts[active_trade["direction"]] = max(
-                            0, direction_counts[active_trade["direction"]] - 1
-                        )
-                        trades_taken = max(0, trades_taken - 1)
-                        active_trade = None
-                if active_trade is not None:
-                    continue
+        breakout_up, breakout_down = _breakout_signals(day, min_breakout_pct, min_breakout_wick_pct)
+        retest_ok = _retest_signals(
+            day,
+            min_size_pct=min_retest_size_pct,
+            max_size_pct=max_retest_size_pct,
+            min_body_inside_pct=min_retest_body_inside_pct,
+        )
+        view = (lambda arr: arr) if HAVE_COMPILED_KERNEL else np.ndarray.tolist
+        signals.append(
+            DaySignals(
+                day=day,
+                breakout_up=view(breakout_up),
+                breakout_down=view(breakout_down),
+                retest_ok=view(retest_ok),
+            )
+        )
+    return signals
 
-            if pending_breakout is not None:
-                if range_low <= bar.close <= range_high:
-                    if not _retest_filters_ok(
-                        bar,
-                        range_high=range_high,
-                        range_low=range_low,
-                        range_size=range_size,
-                        min_size_pct=min_retest_size_pct,
-                        max_size_pct=max_retest_size_pct,
-                        min_body_inside_pct=min_retest_body_inside_pct,
-                    ):
-                        pending_breakout = None
-                        continue
-                    if (
-                        max_reentry_minutes is not None
-                        and pending_breakout.get("time") is not None
-                        and (bar.time - pending_breakout["time"]).total_seconds() / 60.0
-                        > max_reentry_minutes
-                    ):
-                        pending_breakout = None
-                        continue
-                    entry_price = bar.close
-                    stop_price = pending_breakout["stop"]
-                    risk = abs(entry_price - stop_price)
-                    if risk == 0:
-                        pending_breakout = None
-                        continue
-                    direction = "short" if pending_breakout["direction"] == "above" else "long"
-                    if (
-                        max_trades_per_day is not None and trades_taken >= max_trades_per_day
-                    ) or (
-                        max_trades_per_direction is not None
-                        and direction_counts[direction] >= max_trades_per_direction
-                    ):
-                        pending_breakout = None
-                        continue
-                    target_price = entry_price - rr * risk if direction == "short" else entry_price + rr * risk
-                    active_trade = {
-                        "direction": direction,
-                        "entry_time": bar.time,
-                        "entry_price": entry_price,
-                        "stop_price": stop_price,
-                        "target_price": target_price,
-                        "risk": risk,
-                        "rr": rr,
-                    }
-                    trades_taken += 1
-                    direction_counts[direction] += 1
-                    action, info = _check_trade_exit(bar, active_trade, is_entry_bar=True)
-                    if action == "exit":
-                        trades.append(
-                            TradeResult(
-                                day=day.day_start,
-                                direction=active_trade["direction"],
-                                entry_time=active_trade["entry_time"],
-                                entry_price=active_trade["entry_price"],
-                                stop_price=active_trade["stop_price"],
-                                target_price=active_trade["target_price"],
-                                exit_time=bar.time,
-                                exit_price=info["price"],
-                                rr=rr,
-                                pnl_r=info["pnl_r"],
-                                exit_reason=info["reason"],
-                            )
-                        )
-                        active_trade = None
-                    elif action == "cancel":
-                        direction_counts[direction] = max(0, direction_counts[direction] - 1)
-                        trades_taken = max(0, trades_taken - 1)
-                        active_trade = None
-                    pending_breakout = None
-                    continue
 
-                if pending_breakout["direction"] == "above":
-                    if bar.close > range_high:
-                        pending_breakout["stop"] = max(pending_breakout["stop"], bar.high)
-                    elif bar.close < range_low:
-                        if range_size == 0 or (range_low - bar.close) / range_size >= min_breakout_pct:
-                            if _breakout_wick_ok(
-                                bar,
-                                direction="below",
-                                range_high=range_high,
-                                range_low=range_low,
-                                min_pct=min_breakout_wick_pct,
-                            ):
-                                pending_breakout = {
-                                    "direction": "below",
-                                    "stop": bar.low,
-                                    "time": bar.time,
-                                    "breakout_bar": bar,
-                                }
-                            else:
-                                pending_breakout = None
-                        else:
-                            pending_breakout = None
-                else:
-                    if bar.close < range_low:
-                        pending_breakout["stop"] = min(pending_breakout["stop"], bar.low)
-                    elif bar.close > range_high:
-                        if range_size == 0 or (bar.close - range_high) / range_size >= min_breakout_pct:
-                            if _breakout_wick_ok(
-                                bar,
-                                direction="above",
-                                range_high=range_high,
-                                range_low=range_low,
-                                min_pct=min_breakout_wick_pct,
-                            ):
-                                pending_breakout = {
-                                    "direction": "above",
-                                    "stop": bar.high,
-                                    "time": bar.time,
-                                    "breakout_bar": bar,
-                                }
-                            else:
-                                pending_breakout = None
-                        else:
-                            pending_breakout = None
-                continue
+def simulate_trades(
+    signals: Iterable[DaySignals],
+    rr: float,
+    max_trades_per_day: Optional[int] = None,
+    max_trades_per_direction: Optional[int] = None,
+    max_reentry_minutes: Optional[int] = None,
+) -> List[TradeResult]:
+    """Run the breakout/retest state machine for one RR on pre-filtered days."""
+    trades: List[TradeResult] = []
+    # Disabled limits are passed to the kernel as -1
+    limits = (
+        -1 if max_trades_per_day is None else int(max_trades_per_day),
+        -1 if max_trades_per_direction is None else int(max_trades_per_direction),
+        -1 if max_reentry_minutes is None else int(max_reentry_minutes * 60 * 1_000_000_000),
+    )
 
-            if bar.close > range_high:
-                if range_size == 0 or (bar.close - range_high) / range_size >= min_breakout_pct:
-                    if _breakout_wick_ok(
-                        bar,
-                        direction="above",
-                        range_high=range_high,
-                        range_low=range_low,
-                        min_pct=min_breakout_wick_pct,
-                    ):
-                        pending_breakout = {
-                            "direction": "above",
-                            "stop": bar.high,
-                            "time": bar.time,
-                            "breakout_bar": bar,
-                        }
-            elif bar.close < range_low:
-                if range_size == 0 or (range_low - bar.close) / range_size >= min_breakout_pct:
-                    if _breakout_wick_ok(
-                        bar,
-                        direction="below",
-                        range_high=range_high,
-                        range_low=range_low,
-                        min_pct=min_breakout_wick_pct,
-                    ):
-                        pending_breakout = {
-                            "direction": "below",
-                            "stop": bar.low,
-                            "time": bar.time,
-                            "breakout_bar": bar,
-                        }
-
-        if active_trade is not None and day.bars:
-            last_bar = day.bars[-1]
-            exit_price = last_bar.close
-            pnl_r = _pnl_from_exit(exit_price, active_trade)
+    for sig in signals:
+        day = sig.day
+        scan = _day_scan(day)
+        count, trade_int, trade_float = _day_kernel(
+            scan.highs,
+            scan.lows,
+            scan.closes,
+            scan.time_ns,
+            scan.above,
+            scan.inside,
+            scan.next_out,
+            scan.next_not_above,
+            scan.next_not_below,
+            scan.high_table,
+            scan.low_table,
+            sig.breakout_up,
+            sig.breakout_down,
+            sig.retest_ok,
+            scan.start,
+            float(rr),
+            *limits,
+        )
+        if not count:
+            continue
+        # One contiguous column per field: convert each with a single call, then zip into rows
+        directions, entry_idx, exit_idx, reasons = trade_int[:, :count].tolist()
+        entry_prices, stop_prices, target_prices, exit_prices, pnls = trade_float[:, :count].tolist()
+        entry_times = day.time_ns[entry_idx].tolist()
+        exit_times = day.time_ns[exit_idx].tolist()
+        for k in range(count):
             trades.append(
                 TradeResult(
                     day=day.day_start,
-                    direction=active_trade["direction"],
-                    entry_time=active_trade["entry_time"],
-                    entry_price=active_trade["entry_price"],
-                    stop_price=active_trade["stop_price"],
-                    target_price=active_trade["target_price"],
-                    exit_time=last_bar.time,
-                    exit_price=exit_price,
+                    direction="long" if directions[k] == 1 else "short",
+                    entry_time=_from_ns(entry_times[k]),
+                    entry_price=entry_prices[k],
+                    stop_price=stop_prices[k],
+                    target_price=target_prices[k],
+                    exit_time=_from_ns(exit_times[k]),
+                    exit_price=exit_prices[k],
                     rr=rr,
-                    pnl_r=pnl_r,
-                    exit_reason="session_close",
+                    pnl_r=pnls[k],
+                    exit_reason=EXIT_REASONS[reasons[k]],
                 )
             )
 
     return trades
 
 
-def _check_trade_exit(bar: Bar, trade: dict, *, is_entry_bar: bool = False) -> Tuple[str, Optional[dict]]:
-    direction = trade["direction"]
-    stop_price = trade["stop_price"]
-    target_price = trade["target_price"]
+def generate_trade_log(
+    days: Iterable[DayData],
+    rr: float,
+    min_year: int = 2010,
+    max_trades_per_day: Optional[int] = None,
+    max_trades_per_direction: Optional[int] = None,
+    max_reentry_minutes: Optional[int] = None,
+    min_breakout_pct: float = 0.0,
+    min_breakout_wick_pct: Optional[float] = None,
+    min_box_size: Optional[float] = None,
+    max_box_size: Optional[float] = None,
+    min_retest_size_pct: Optional[float] = None,
+    max_retest_size_pct: Optional[float] = None,
+    min_retest_body_inside_pct: Optional[float] = None,
+) -> List[TradeResult]:
+    """Trade log for one RR. Days are filtered and simulated one at a time, so `days` can be a stream."""
+    trades: List[TradeResult] = []
+    for day in days:
+        signals = detect_signals(
+            (day,),
+            min_year=min_year,
+            min_breakout_pct=min_breakout_pct,
+            min_breakout_wick_pct=min_breakout_wick_pct,
+            min_box_size=min_box_size,
+            max_box_size=max_box_size,
+            min_retest_size_pct=min_retest_size_pct,
+            max_retest_size_pct=max_retest_size_pct,
+            min_retest_body_inside_pct=min_retest_body_inside_pct,
+        )
+        trades.extend(
+            simulate_trades(
+                signals,
+                rr,
+                max_trades_per_day=max_trades_per_day,
+                max_trades_per_direction=max_trades_per_direction,
+                max_reentry_minutes=max_reentry_minutes,
+            )
+        )
+    return trades
 
-    if direction == "long":
-        stop_hit = bar.low <= stop_price
-        target_hit = bar.high >= target_price
-    else:
-        stop_hit = bar.high >= stop_price
-        target_hit = bar.low <= target_price
 
-    if is_entry_bar:
-        if stop_hit:
-            return "exit", {"price": stop_price, "pnl_r": -1.0, "reason": "stop"}
-        if target_hit:
-            return "hold", None
-        return "hold", None
+def _ohlc_float64(day: DayData) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Ratios are computed in float64 so the filter thresholds behave as with float64 prices
+    return tuple(arr.astype(np.float64) for arr in (day.open, day.high, day.low, day.close))
 
-    if stop_hit and target_hit:
-        return "cancel", None
-    if stop_hit:
-        return "exit", {"price": stop_price, "pnl_r": -1.0, "reason": "stop"}
-    if target_hit:
-        return "exit", {"price": target_price, "pnl_r": trade["rr"], "reason": "target"}
-    return "hold", None
 
+def _breakout_signals(
+    day: DayData, min_breakout_pct: float, min_wick_pct: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Breakout distance + wick filters for a close above / below the range, per bar."""
+    open_, high, low, close = _ohlc_float64(day)
+    range_high, range_low = day.range_high, day.range_low
+    range_size = range_high - range_low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if range_size != 0:
+            up = ~((close - range_high) / range_size < min_breakout_pct)
+            down = ~((range_low - close) / range_size < min_breakout_pct)
+        else:
+            up = np.ones(len(close), dtype=bool)
+            down = np.ones(len(close), dtype=bool)
 
-def _breakout_wick_ok(
-    bar: Bar,
-    *,
-    direction: str,
-    range_high: float,
-    range_low: float,
-    min_pct: Optional[float],
-) -> bool:
-    if min_pct is None:
-        return True
-    candle_range = bar.high - bar.low
-    if candle_range <= 0:
-        return False
-    if direction == "above":
-        body_top = max(bar.open, bar.close)
-        outer = max(0.0, bar.high - max(range_high, body_top))
-    else:
-        body_bottom = min(bar.open, bar.close)
-        outer = max(0.0, min(range_low, body_bottom) - bar.low)
-    ratio = outer / candle_range
-    return ratio >= min_pct
+        if min_wick_pct is not None:
+            candle_range = high - low
+            outer_up = np.maximum(0.0, high - np.maximum(range_high, np.maximum(open_, close)))
+            outer_down = np.maximum(0.0, np.minimum(range_low, np.minimum(open_, close)) - low)
+            up &= (candle_range > 0) & (outer_up / candle_range >= min_wick_pct)
+            down &= (candle_range > 0) & (outer_down / candle_range >= min_wick_pct)
+    return up, down
 
 
-def _retest_filters_ok(
-    bar: Bar,
+def _retest_signals(
+    day: DayData,
     *,
-    range_high: float,
-    range_low: float,
-    range_size: float,
     min_size_pct: Optional[float],
     max_size_pct: Optional[float],
     min_body_inside_pct: Optional[float],
-) -> bool:
-    candle_range = bar.high - bar.low
-    if range_size <= 0:
-        size_ratio = None
-    else:
-        size_ratio = candle_range / range_size if candle_range >= 0 else None
-
-    if min_size_pct is not None:
-        if size_ratio is None or size_ratio < min_size_pct:
-            return False
-    if max_size_pct is not None:
-        if size_ratio is None or size_ratio > max_size_pct:
-            return False
+) -> np.ndarray:
+    """Retest candle size / body-inside filters, per bar."""
+    open_, high, low, close = _ohlc_float64(day)
+    range_high, range_low = day.range_high, day.range_low
+    range_size = range_high - range_low
+    ok = np.ones(len(close), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        candle_range = high - low
+        # Size ratio is undefined (NaN) for an empty box or a negative candle range
+        if range_size > 0:
+            size_ratio = np.where(candle_range >= 0, candle_range / range_size, np.nan)
+        else:
+            size_ratio = np.full(len(close), np.nan)
+
+        if min_size_pct is not None:
+            ok &= ~np.isnan(size_ratio) & ~(size_ratio < min_size_pct)
+        if max_size_pct is not None:
+            ok &= ~np.isnan(size_ratio) & ~(size_ratio > max_size_pct)
+
+        if min_body_inside_pct is not None:
+            body_top = np.maximum(open_, close)
+            body_bottom = np.minimum(open_, close)
+            body_size = body_top - body_bottom
+            inside = np.maximum(0.0, np.minimum(body_top, range_high) - np.maximum(body_bottom, range_low))
+            ok &= (body_size > 0) & ~(inside / body_size < min_body_inside_pct)
+    return ok
+
+
+# Exit codes returned by the day kernel (index into EXIT_REASONS)
+EXIT_STOP, EXIT_TARGET, EXIT_SESSION_CLOSE = 0, 1, 2
+EXIT_REASONS = ("stop", "target", "session_close")
+
+# _check_trade_exit actions
+ACTION_HOLD, ACTION_EXIT_STOP, ACTION_EXIT_TARGET, ACTION_CANCEL = 0, 1, 2, 3
+
+
+@njit(cache=True)
+def _simulate_day(
+    highs,
+    lows,
+    closes,
+    time_ns,
+    above,
+    inside,
+    next_out,
+    next_not_above,
+    next_not_below,
+    high_table,
+    low_table,
+    breakout_up,
+    breakout_down,
+    retest_ok,
+    start,
+    rr,
+    max_trades_per_day,
+    max_trades_per_direction,
+    max_reentry_ns,
+):
+    """Breakout/retest state machine for one day.
+
+    Returns (count, trade_int, trade_float) as column arrays: columns [0, count) hold
+    (direction +1 long / -1 short, entry bar, exit bar, exit code) and
+    (entry, stop, target, exit price, pnl_r).
+    """
+    n = len(closes)
+    trade_int = np.empty((4, n + 1), dtype=np.int64)
+    trade_float = np.empty((5, n + 1), dtype=np.float64)
+    count = 0
+    trades_taken = 0
+    long_count = 0
+    short_count = 0
+
+    # Pending breakout: direction +1 above / -1 below / 0 none
+    pb_dir = 0
+    pb_stop = 0.0
+    pb_time = 0
+    # Active trade: direction +1 long / -1 short / 0 none
+    at_dir = 0
+    at_idx = 0
+    at_entry = 0.0
+    at_stop = 0.0
+    at_target = 0.0
+
+    i = start
+    while i < n:
+        if at_dir == 0 and pb_dir == 0:
+            # Idle: bars closing inside the range cannot change state, jump to the next close outside
+            i = next_out[i]
+            if i == n:
+                break
+
+        if at_dir != 0:
+            # Bars that touch neither stop nor target only hold: go straight to the first touch
+            i = _next_exit_bar(high_table, low_table, n, i, at_dir, at_stop, at_target)
+            if i == n:
+                break
+            action = _check_trade_exit(highs[i], lows[i], at_dir, at_stop, at_target)
+            if action == ACTION_EXIT_STOP or action == ACTION_EXIT_TARGET:
+                trade_int[0, count] = at_dir
+                trade_int[1, count] = at_idx
+                trade_int[2, count] = i
+                trade_float[0, count] = at_entry
+                trade_float[1, count] = at_stop
+                trade_float[2, count] = at_target
+                if action == ACTION_EXIT_STOP:
+                    trade_int[3, count] = EXIT_STOP
+                    trade_float[3, count] = at_stop
+                    trade_float[4, count] = -1.0
+                else:
+                    trade_int[3, count] = EXIT_TARGET
+                    trade_float[3, count] = at_target
+                    trade_float[4, count] = rr
+                count += 1
+            elif action == ACTION_CANCEL:
+                if at_dir == 1:
+                    long_count = max(0, long_count - 1)
+                else:
+                    short_count = max(0, short_count - 1)
+                trades_taken = max(0, trades_taken - 1)
+            at_dir = 0
+
+        if pb_dir != 0:
+            if inside[i]:
+                # Retest: the bar closing back inside is the entry candidate
+                e = i
+                i += 1
+                direction = -1 if pb_dir == 1 else 1
+                stop_price = pb_stop
+                breakout_time = pb_time
+                pb_dir = 0
+                if not retest_ok[e]:
+                    continue
+                if max_reentry_ns >= 0 and time_ns[e] - breakout_time > max_reentry_ns:
+                    continue
+                entry_price = closes[e]
+                risk = abs(entry_price - stop_price)
+                if risk == 0:
+                    continue
+                if (max_trades_per_day >= 0 and trades_taken >= max_trades_per_day) or (
+                    max_trades_per_direction >= 0
+                    and (long_count if direction == 1 else short_count) >= max_trades_per_direction
+                ):
+                    continue
+                target_price = entry_price + rr * risk if direction == 1 else entry_price - rr * risk
+                trades_taken += 1
+                if direction == 1:
+                    long_count += 1
+                else:
+                    short_count += 1
+                if _entry_bar_stopped(highs[e], lows[e], direction, stop_price):
+                    trade_int[0, count] = direction
+                    trade_int[1, count] = e
+                    trade_int[2, count] = e
+                    trade_int[3, count] = EXIT_STOP
+                    trade_float[0, count] = entry_price
+                    trade_float[1, count] = stop_price
+                    trade_float[2, count] = target_price
+                    trade_float[3, count] = stop_price
+                    trade_float[4, count] = -1.0
+                    count += 1
+                else:
+                    at_dir = direction
+                    at_idx = e
+                    at_entry = entry_price
+                    at_stop = stop_price
+                    at_target = target_price
+                continue
 
-    if min_body_inside_pct is not None:
-        body_top = max(bar.open, bar.close)
-        body_bottom = min(bar.open, bar.close)
-        body_size = body_top - body_bottom
-        if body_size <= 0:
-            return False
-        inside_high = min(body_top, range_high)
-        inside_low = max(body_bottom, range_low)
-        inside = max(0.0, inside_high - inside_low)
-        if inside / body_size < min_body_inside_pct:
-            return False
+            # Consecutive closes on the breakout side only push the stop: take the whole run at once
+            if pb_dir == 1:
+                if above[i]:
+                    j = next_not_above[i]
+                    for k in range(i, j):
+                        if highs[k] > pb_stop:
+                            pb_stop = highs[k]
+                    i = j
+                    continue
+                if breakout_down[i]:
+                    pb_dir, pb_stop, pb_time = -1, lows[i], time_ns[i]
+                else:
+                    pb_dir = 0
+            else:
+                if not above[i]:
+                    j = next_not_below[i]
+                    for k in range(i, j):
+                        if lows[k] < pb_stop:
+                            pb_stop = lows[k]
+                    i = j
+                    continue
+                if breakout_up[i]:
+                    pb_dir, pb_stop, pb_time = 1, highs[i], time_ns[i]
+                else:
+                    pb_dir = 0
+            i += 1
+            continue
 
-    return True
+        if not inside[i]:
+            if above[i]:
+                if breakout_up[i]:
+                    pb_dir, pb_stop, pb_time = 1, highs[i], time_ns[i]
+            elif breakout_down[i]:
+                pb_dir, pb_stop, pb_time = -1, lows[i], time_ns[i]
+        i += 1
+
+    if at_dir != 0 and n > 0:
+        exit_price = closes[n - 1]
+        trade_int[0, count] = at_dir
+        trade_int[1, count] = at_idx
+        trade_int[2, count] = n - 1
+        trade_int[3, count] = EXIT_SESSION_CLOSE
+        trade_float[0, count] = at_entry
+        trade_float[1, count] = at_stop
+        trade_float[2, count] = at_target
+        trade_float[3, count] = exit_price
+        trade_float[4, count] = _pnl_from_exit(exit_price, at_dir, at_entry, abs(at_entry - at_stop))
+        count += 1
+
+    return count, trade_int, trade_float
+
+
+_day_kernel = _simulate_day_aot if _simulate_day_aot is not None else _simulate_day
+
+
+def build_kernel(output_dir: Path) -> Path:
+    """Compile _simulate_day ahead of time into the trade_kernel_4h extension (numba.pycc + a C compiler)."""
+    if not HAVE_NUMBA:
+        raise RuntimeError("Building the kernel requires numba.")
+    from numba import types
+    from numba.pycc import CC
+
+    floats = types.float32[::1]
+    ints = types.int64[::1]
+    flags = types.boolean[::1]
+    signature = types.Tuple((types.int64, types.int64[:, ::1], types.float64[:, ::1]))(
+        floats, floats, floats,  # highs, lows, closes
+        ints, flags, flags, ints, ints, ints,  # time_ns, above, inside, next_out/not_above/not_below
+        floats, floats,  # high_table, low_table
+        flags, flags, flags,  # breakout_up, breakout_down, retest_ok
+        types.int64, types.float64, types.int64, types.int64, types.int64,  # start, rr, limits
+    )
+    cc = CC("trade_kernel_4h")
+    cc.output_dir = str(output_dir)
+    cc.export("simulate_day", signature)(_simulate_day.py_func)
+    cc.compile()
+    return output_dir
+
+
+@njit(inline="always")
+def _next_exit_bar(high_table, low_table, n, start, direction, stop_price, target_price):
+    """First bar >= start touching the trade's stop or target (n if none)."""
+    if direction == 1:
+        stop_bar = _first_low_at_most(low_table, n, start, stop_price)
+        target_bar = _first_high_at_least(high_table, n, start, target_price)
+    else:
+        stop_bar = _first_high_at_least(high_table, n, start, stop_price)
+        target_bar = _first_low_at_most(low_table, n, start, target_price)
+    return min(stop_bar, target_bar)
+
+
+@njit(inline="always")
+def _first_high_at_least(high_table, n, start, price):
+    # Skip the largest blocks whose highest high stays below price, halving the block each level
+    j = start
+    k = len(high_table) // n - 1 if n else -1
+    while k >= 0 and j < n:
+        if high_table[k * n + j] < price:
+            j += 1 << k
+        k -= 1
+    return min(j, n)
+
+
+@njit(inline="always")
+def _first_low_at_most(low_table, n, start, price):
+    j = start
+    k = len(low_table) // n - 1 if n else -1
+    while k >= 0 and j < n:
+        if low_table[k * n + j] > price:
+            j += 1 << k
+        k -= 1
+    return min(j, n)
+
+
+@njit(inline="always")
+def _entry_bar_stopped(high, low, direction, stop_price):
+    # On the entry bar only the stop counts
+    if direction == 1:
+        return low <= stop_price
+    return high >= stop_price
+
+
+@njit(inline="always")
+def _check_trade_exit(high, low, direction, stop_price, target_price):
+    if direction == 1:
+        return _exit_action(low <= stop_price, high >= target_price)
+    return _exit_action(high >= stop_price, low <= target_price)
+
+
+@njit(inline="always")
+def _exit_action(stop_hit, target_hit):
+    if stop_hit and target_hit:
+        return ACTION_CANCEL
+    if stop_hit:
+        return ACTION_EXIT_STOP
+    if target_hit:
+        return ACTION_EXIT_TARGET
+    return ACTION_HOLD
 
 
-def _pnl_from_exit(exit_price: float, trade: dict) -> float:
-    if trade["direction"] == "long":
-        return (exit_price - trade["entry_price"]) / trade["risk"]
-    return (trade["entry_price"] - exit_price) / trade["risk"]
+@njit(inline="always")
+def _pnl_from_exit(exit_price, direction, entry_price, risk):
+    if direction == 1:
+        return (exit_price - entry_price) / risk
+    return (entry_price - exit_price) / risk
 
 
 def evaluate_rrs(
@@ -591,26 +1093,35 @@ def evaluate_rrs(
     min_retest_size_pct: Optional[float],
     max_retest_size_pct: Optional[float],
     min_retest_body_inside_pct: Optional[float],
+    workers: int = 1,
 ) -> Tuple[float, List[TradeResult]]:
     best_result: Optional[Tuple[float, float, List[TradeResult]]] = None
+    # Day selection and candle filters do not depend on the RR: evaluate them once for the sweep
+    signals = detect_signals(
+        days,
+        min_breakout_pct=min_breakout_pct,
+        min_breakout_wick_pct=min_breakout_wick_pct,
+        min_box_size=min_box_size,
+        max_box_size=max_box_size,
+        min_retest_size_pct=min_retest_size_pct,
+        max_retest_size_pct=max_retest_size_pct,
+        min_retest_body_inside_pct=min_retest_body_inside_pct,
+    )
+    limits = dict(
+        max_trades_per_day=max_trades_per_day,
+        max_trades_per_direction=max_trades_per_direction,
+        max_reentry_minutes=max_reentry_minutes,
+    )
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(rr_values) > 1:
+        return _evaluate_rrs_parallel(signals, rr_values, min_avg_r, min_trades, limits, workers)
+
     for rr in rr_values:
-        trades = generate_trade_log(
-            days,
-            rr,
-            max_trades_per_day=max_trades_per_day,
-            max_trades_per_direction=max_trades_per_direction,
-            max_reentry_minutes=max_reentry_minutes,
-            min_breakout_pct=min_breakout_pct,
-            min_breakout_wick_pct=min_breakout_wick_pct,
-            min_box_size=min_box_size,
-            max_box_size=max_box_size,
-            min_retest_size_pct=min_retest_size_pct,
-            max_retest_size_pct=max_retest_size_pct,
-            min_retest_body_inside_pct=min_retest_body_inside_pct,
-        )
+        trades = simulate_trades(signals, rr, **limits)
         if not trades:
             continue
-        avg_r = sum(trade.pnl_r for trade in trades) / len(trades)
+        avg_r = float(_pnl_array(trades).mean())
         if best_result is None or avg_r > best_result[0]:
             best_result = (avg_r, rr, trades)
         if len(trades) >= min_trades and avg_r >= min_avg_r:
@@ -625,6 +1136,64 @@ def evaluate_rrs(
     raise RuntimeError("No trades generated for the provided parameters.")
 
 
+def _evaluate_rrs_parallel(
+    signals: List[DaySignals],
+    rr_values: Sequence[float],
+    min_avg_r: float,
+    min_trades: int,
+    limits: dict,
+    workers: int,
+) -> Tuple[float, List[TradeResult]]:
+    """Score every RR in worker processes, then apply the serial selection rule in RR order.
+
+    Workers only send back (trade count, average R); the trade log of the selected RR is rebuilt
+    locally, so the result is identical to the serial sweep.
+    """
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(rr_values)),
+        initializer=_init_rr_worker,
+        initargs=(signals, limits),
+    ) as executor:
+        scores = list(executor.map(_score_rr, rr_values))
+
+    best_result: Optional[Tuple[float, float]] = None
+    for rr, (count, avg_r) in zip(rr_values, scores):
+        if not count:
+            continue
+        if best_result is None or avg_r > best_result[0]:
+            best_result = (avg_r, rr)
+        if count >= min_trades and avg_r >= min_avg_r:
+            return rr, simulate_trades(signals, rr, **limits)
+    if best_result is not None:
+        best_avg, best_rr = best_result
+        print(
+            "Warning: no RR met the constraints; returning the best available setup",
+            f"(RR={best_rr}, average R={best_avg:.4f}).",
+        )
+        return best_rr, simulate_trades(signals, best_rr, **limits)
+    raise RuntimeError("No trades generated for the provided parameters.")
+
+
+_WORKER_STATE: Optional[Tuple[List[DaySignals], dict]] = None
+
+
+def _init_rr_worker(signals: List[DaySignals], limits: dict) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = (signals, limits)
+
+
+def _score_rr(rr: float) -> Tuple[int, float]:
+    signals, limits = _WORKER_STATE
+    trades = simulate_trades(signals, rr, **limits)
+    if not trades:
+        return 0, 0.0
+    return len(trades), float(_pnl_array(trades).mean())
+
+
+def _pnl_array(trades: Sequence[TradeResult]) -> np.ndarray:
+    return np.fromiter((trade.pnl_r for trade in trades), dtype=np.float64, count=len(trades))
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -638,6 +1207,27 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--rr-start", type=float, default=RR_START)
     parser.add_argument("--rr-end", type=float, default=RR_END)
     parser.add_argument("--rr-step", type=float, default=RR_STEP)
+    parser.add_argument(
+        "--rr",
+        type=float,
+        help="Run a single RR multiple instead of the sweep, streaming the CSV day by day.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Number of processes for the RR sweep (0 = one per CPU core).",
+    )
+    parser.add_argument(
+        "--polars",
+        action="store_true",
+        help="Parse the minute CSV with polars instead of pandas (requires polars).",
+    )
+    parser.add_argument(
+        "--build-kernel",
+        action="store_true",
+        help="Compile the day kernel ahead of time next to this script (trade_kernel_4h) and exit.",
+    )
     parser.add_argument(
         "--export-trades",
         type=Path,
@@ -731,6 +1321,10 @@ def frange(start: float, end: float, step: float) -> List[float]:
 
 
 def export_trades(trades: Iterable[TradeResult], path: Path) -> None:
+    trades = list(trades)
+    if HAVE_PANDAS:
+        _export_trades_pandas(trades, path)
+        return
     rows = [asdict(trade) for trade in trades]
     rows.sort(key=lambda row: row["entry_time"])
     if not rows:
@@ -743,18 +1337,23 @@ def export_trades(trades: Iterable[TradeResult], path: Path) -> None:
             writer.writerow(row)
 
 
+def _export_trades_pandas(trades: Sequence[TradeResult], path: Path) -> None:
+    if not trades:
+        return
+    # Column-wise build and C writer, same layout as the csv module output (stable sort on entry time)
+    names = [item.name for item in fields(TradeResult)]
+    frame = pd.DataFrame({name: [getattr(trade, name) for trade in trades] for name in names})
+    frame = frame.sort_values("entry_time", kind="stable")
+    frame.to_csv(path, index=False, lineterminator="\r\n")
+
+
 def main() -> None:
     args = parse_args()
-    days = load_day_data(args.data_dir)
-    if not days:
-        raise SystemExit("No data loaded.")
-
-    rr_values = frange(args.rr_start, args.rr_end, args.rr_step)
-    selected_rr, trades = evaluate_rrs(
-        days=days,
-        rr_values=rr_values,
-        min_avg_r=args.min_avg_r,
-        min_trades=args.min_trades,
+    if args.build_kernel:
+        print(f"Kernel built in {build_kernel(DATA_DIR)}")
+        return
+
+    filters = dict(
         max_trades_per_day=args.max_trades_per_day,
         max_trades_per_direction=args.max_trades_per_direction,
         max_reentry_minutes=args.max_reentry_minutes,
@@ -766,12 +1365,32 @@ def main() -> None:
         max_retest_size_pct=args.max_retest_size_pct,
         min_retest_body_inside_pct=args.min_retest_body_inside_pct,
     )
+    if args.rr is not None:
+        # Single RR: the history is never held in memory, only one parsed block at a time
+        selected_rr = args.rr
+        trades = generate_trade_log(iter_day_data(args.data_dir, use_polars=args.polars), rr=args.rr, **filters)
+    else:
+        # The RR sweep re-simulates every day for each RR, so all days stay loaded
+        days = load_day_data(args.data_dir, use_polars=args.polars)
+        if not days:
+            raise SystemExit("No data loaded.")
+
+        rr_values = frange(args.rr_start, args.rr_end, args.rr_step)
+        selected_rr, trades = evaluate_rrs(
+            days=days,
+            rr_values=rr_values,
+            min_avg_r=args.min_avg_r,
+            min_trades=args.min_trades,
+            workers=args.workers,
+            **filters,
+        )
 
     total_trades = len(trades)
-    wins = sum(1 for trade in trades if trade.pnl_r > 0)
-    losses = sum(1 for trade in trades if trade.pnl_r < 0)
-    avg_r = sum(trade.pnl_r for trade in trades) / total_trades if total_trades else 0.0
-    total_r = sum(trade.pnl_r for trade in trades)
+    pnl = _pnl_array(trades)
+    wins = int(np.count_nonzero(pnl > 0))
+    losses = int(np.count_nonzero(pnl < 0))
+    total_r = float(pnl.sum())
+    avg_r = total_r / total_trades if total_trades else 0.0
     win_rate = (wins / total_trades * 100.0) if total_trades else 0.0
 
     print(f"Selected RR multiple: {selected_rr:.2f}")
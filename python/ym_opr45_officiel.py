@@ -1,9 +1,22 @@
+import csv
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import warnings
+from datetime import time
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from numba import njit, prange, vectorize
+    HAVE_NUMBA = True
+except ImportError:  # numba optionnel : mêmes noyaux, exécutés en Python pur
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+    prange = range
+
 # =====================================================
 # CONFIG — STRATÉGIE FINALE
 # =====================================================
@@ -46,6 +59,10 @@ BOX_BAND_MAX = 210.0
 # Timeframe de la bougie de cassure (ex: "1min", "3min", "5min", "10min")
 BREAK_TF = "15min"
 
+# Précision des prix OHLC en mémoire (float32 : deux fois moins d'octets à parcourir dans les scans ;
+# R et cum_R restent en float64)
+PRICE_DTYPE = np.float32
+
 # >>> STOP LOSS en % de la box (depuis l’extrémité côté cassure) <<<
 # ex: 0.20 (20%), 0.30 (30%), 0.40 (40%), 0.50 (50% = mid), etc.
 STOP_FRAC = 0.50
@@ -60,6 +77,10 @@ PLOT_DPI = 120
 # =====================================================
 FiveMinAgg = {"Open": "first", "High": "max", "Low": "min", "Close": "last"}  # utilisé pour tout TF
 
+# Durées construites une seule fois (pas de parsing de Timedelta par setup)
+_BREAK_TD = pd.Timedelta(BREAK_TF)
+_MINUTE_NS = pd.Timedelta(minutes=1).value
+
 def _norm(s: Any) -> str:
     return "".join(ch.lower() for ch in str(s) if ch.isalnum())
 
@@ -75,9 +96,20 @@ def passes_box_filter(box_high: float, box_low: float) -> bool:
         return (width >= float(BOX_BAND_MIN)) and (width <= float(BOX_BAND_MAX))
     return True
 
+def _sniff_sep(csv_path: str) -> str:
+    """Séparateur deviné sur la ligne d'en-tête (comme sep=None du parseur Python)."""
+    with open(csv_path, newline="") as fh:
+        header = fh.readline()
+    try:
+        return csv.Sniffer().sniff(header, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
 def load_ohlc_paris(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path, sep=None, engine="python")
-    cols = {c: _norm(c) for c in df.columns}
+    # En-tête seul pour repérer les colonnes, puis lecture typée (moteur C, colonnes utiles uniquement)
+    sep = _sniff_sep(csv_path)
+    header = pd.read_csv(csv_path, sep=sep, nrows=0)
+    cols = {c: _norm(c) for c in header.columns}
 
     time_col_candidates = [k for k, v in cols.items()
                            if ("timeleft" in v) or v.startswith("time") or ("datetime" in v) or v.endswith("time")]
@@ -93,7 +125,12 @@ def load_ohlc_paris(csv_path: str) -> pd.DataFrame:
         raise ValueError("Colonnes OHLC introuvables.")
 
     open_col, high_col, low_col, close_col = open_col_list[0], high_col_list[0], low_col_list[0], close_col_list[0]
-    df = df[[time_col, open_col, high_col, low_col, close_col]].copy()
+    usecols = [time_col, open_col, high_col, low_col, close_col]
+    df = pd.read_csv(
+        csv_path, sep=sep, engine="c", usecols=usecols,
+        dtype={c: "float64" for c in usecols[1:]}, float_precision="round_trip",
+    )[usecols]
+    df[usecols[1:]] = df[usecols[1:]].astype(PRICE_DTYPE)
     df.columns = ["Time", "Open", "High", "Low", "Close"]
 
     df["Time"] = pd.to_datetime(df["Time"], errors="coerce")
@@ -107,29 +144,28 @@ def load_ohlc_paris(csv_path: str) -> pd.DataFrame:
     df["Time_PARIS"] = df["Time"].dt.tz_convert(LOCAL_TZ)
     return df.set_index("Time_PARIS")[['Open', 'High', 'Low', 'Close']].copy()
 
-def first_break_close_out(df_brk_day: pd.DataFrame, bh: float, bl: float):
-    """Première clôture BREAK_TF qui sort de la box (fenêtre BREAK)."""
-    df_brk_ny = df_brk_day.tz_convert(EXCHANGE_TZ).between_time(BREAK_SCAN_START_NY, BREAK_SCAN_END_NY)
-    for ts_ny, row in df_brk_ny.iterrows():
-        c = float(row["Close"])
-        if c > bh:
-            ts_paris = ts_ny.tz_convert(LOCAL_TZ)
-            return "long", ts_paris, ts_paris + pd.Timedelta(BREAK_TF), c
-        if c < bl:
-            ts_paris = ts_ny.tz_convert(LOCAL_TZ)
-            return "short", ts_paris, ts_paris + pd.Timedelta(BREAK_TF), c
-    return None, None, None, None
-
-def outside_wick_frac(side: str, bh: float, bl: float, o: float, h: float, l: float, c: float) -> float:
-    """Mèche côté cassure / range bougie (0..1)."""
-    rng = max(h - l, 1e-12)
-    body_hi = max(o, c)
-    body_lo = min(o, c)
-    if side == "long":
-        wick_out = max(0.0, h - body_hi)  # mèche haute
-    else:
-        wick_out = max(0.0, body_lo - l)  # mèche basse
-    return float(wick_out / rng)
+def between_time_mask(index: pd.DatetimeIndex, start: str, end: str) -> np.ndarray:
+    """Équivalent vectorisé de between_time (bornes incluses) sur l'heure locale de l'index."""
+    secs = index.hour * 3600 + index.minute * 60 + index.second
+    lo = pd.Timedelta(f"{start}:00").total_seconds()
+    hi = pd.Timedelta(f"{end}:00").total_seconds()
+    return np.asarray((secs >= lo) & (secs <= hi))
+
+def first_break_close_out(df_brk_ny: pd.DataFrame, bh: float, bl: float):
+    """
+    Première clôture BREAK_TF qui sort de la box (df_brk_ny : bougies du jour déjà en heure NY, fenêtre BREAK).
+    Retourne (side, début Paris, fin Paris, clôture, position de la bougie dans df_brk_ny).
+    """
+    closes = df_brk_ny["Close"].to_numpy(dtype=float)
+    # masque des clôtures hors box, argmax = première occurrence
+    out_up = closes > bh
+    out = out_up | (closes < bl)
+    if not out.any():
+        return None, None, None, None, None
+    idx = int(out.argmax())
+    ts_paris = df_brk_ny.index[idx].tz_convert(LOCAL_TZ)
+    side = "long" if out_up[idx] else "short"
+    return side, ts_paris, ts_paris + _BREAK_TD, float(closes[idx]), idx
 
 def compute_stop_and_risk(side: str, box_high: float, box_low: float, stop_frac: float) -> Tuple[float, float]:
     """
@@ -155,160 +191,347 @@ def compute_stop_and_risk(side: str, box_high: float, box_low: float, stop_frac:
 
     return float(stop), float(max(risk, 0.0))
 
+# Codes de sortie renvoyés par le noyau de simulation
+REASON_SL, REASON_TP, REASON_TIMEOUT = 0, 1, 2
+REASON_NAMES = ("SL", "TP", "TIMEOUT")
+
+@njit(cache=True)
+def _first_touch(hi, lo, level, side_long):
+    """Index de la 1ère bougie qui touche le niveau (long : Low <= level ; short : High >= level), -1 sinon."""
+    for i in range(hi.shape[0]):
+        if (lo[i] <= level) if side_long else (hi[i] >= level):
+            return i
+    return -1
+
+@njit(cache=True)
+def _scan_tp_sl(hi, lo, close, stop, tp, side_long):
+    """
+    Parcours bougie par bougie depuis la bougie d'entrée (index 0).
+    Retourne (index de sortie, prix de sortie, code de sortie).
+    """
+    n = hi.shape[0]
+    # 1ère bougie d'entrée : seul le SL compte (TP seul ignoré, TP+SL -> SL)
+    if (lo[0] <= stop) if side_long else (hi[0] >= stop):
+        return 0, stop, REASON_SL
+
+    for i in range(1, n):
+        if side_long:
+            if lo[i] <= stop:
+                return i, stop, REASON_SL
+            if hi[i] >= tp:
+                return i, tp, REASON_TP
+        else:
+            if hi[i] >= stop:
+                return i, stop, REASON_SL
+            if lo[i] <= tp:
+                return i, tp, REASON_TP
+
+    return n - 1, close[n - 1], REASON_TIMEOUT
+
+def _epoch_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """Index horodaté -> epoch-ns int64 (UTC), quelle que soit la résolution de l'index."""
+    return index.values.astype("datetime64[ns]").view("i8")
+
+@njit(cache=True)
+def _overextended(hi, lo, break_px, limit, side_long):
+    """Extension max avant l'entrée (NaN ignorés) au-delà de `limit` depuis le prix de cassure ?"""
+    if side_long:
+        top = -np.inf
+        for v in hi:
+            if v > top:
+                top = v
+        return top - break_px > limit
+    bottom = np.inf
+    for v in lo:
+        if v < bottom:
+            bottom = v
+    return break_px - bottom > limit
+
+@njit(parallel=True, cache=True)
+def _simulate_days_nb(ts, hi, lo, close, d0, d1, brk_end, retest_end, cutoff,
+                      entry, stop, tp, break_px, overext_lim, side_long):
+    """
+    Suivi des trades, un setup (= un jour indépendant) par itération prange,
+    sur les tableaux complets + bornes [d0 ; d1[ du jour. Règles strictes :
+    - Retest STRICTEMENT après la bougie de cassure.
+    - Sur la 1ère bougie d'entrée : si SL touché -> SL direct ; si TP seul -> on ignore le TP et on continue ;
+      si TP+SL sur la même bougie -> SL.
+    SL placé selon STOP_FRAC (% de la box depuis l’extrémité côté cassure).
+    Retourne par setup (index absolu d'entrée, index absolu de sortie, prix de sortie, code) ; entrée -1 = pas de trade.
+    """
+    m = d0.shape[0]
+    out_entry = np.full(m, -1, dtype=np.int64)
+    out_exit = np.zeros(m, dtype=np.int64)
+    out_px = np.zeros(m, dtype=np.float64)
+    out_code = np.zeros(m, dtype=np.int64)
+    for s in prange(m):
+        a = d0[s]
+        day = ts[a:d1[s]]
+        # Fenêtre de retest ]break_end ; retest_end[
+        i0 = a + np.searchsorted(day, brk_end[s], side="right")
+        i1 = a + np.searchsorted(day, retest_end[s], side="left")
+        if i0 >= i1:
+            continue
+        hit = _first_touch(hi[i0:i1], lo[i0:i1], entry[s], side_long[s])
+        if hit < 0:
+            continue
+        j0 = a + np.searchsorted(day, ts[i0 + hit], side="left")
+        # Overextension sur les bougies strictement avant le toucher (limite infinie = filtre inactif)
+        if j0 > i0 and _overextended(hi[i0:j0], lo[i0:j0], break_px[s], overext_lim[s], side_long[s]):
+            continue
+        j1 = a + np.searchsorted(day, cutoff[s], side="right")
+        if j0 >= j1:
+            continue
+        k, px, code = _scan_tp_sl(hi[j0:j1], lo[j0:j1], close[j0:j1], stop[s], tp[s], side_long[s])
+        out_entry[s] = i0 + hit
+        out_exit[s] = j0 + k
+        out_px[s] = px
+        out_code[s] = code
+    return out_entry, out_exit, out_px, out_code
+
+def _paris_ts(ns: int) -> pd.Timestamp:
+    """Horodatage epoch-ns (UTC) -> Timestamp Paris."""
+    return pd.Timestamp(int(ns), tz="UTC").tz_convert(LOCAL_TZ)
+
+def _trade_levels(side: str, box_high: float, box_low: float, break_px: float,
+                  tp_r: float, overext_mult: float) -> Optional[Tuple[float, float, float, float, float]]:
+    """
+    Niveaux d'un setup : (entrée, SL, TP, limite d'overextension, risque en points), None si risque nul.
+    Limite infinie = filtre d'overextension inactif.
+    """
+    stop, risk_points = compute_stop_and_risk(side, box_high, box_low, STOP_FRAC)
+    if risk_points <= 0:
+        return None
+    entry = box_high if side == "long" else box_low
+    # TP à tp_r * risk_points depuis l'entrée
+    tp = entry + tp_r * risk_points if side == "long" else entry - tp_r * risk_points
+    limit = np.inf
+    if overext_mult and overext_mult > 0 and np.isfinite(overext_mult):
+        dist_from_mid = abs(float(break_px) - (box_high + box_low) / 2.0)
+        if dist_from_mid > 0:
+            limit = overext_mult * dist_from_mid
+    return float(entry), float(stop), float(tp), float(limit), risk_points
+
 def simulate_trade(
-    day_paris: pd.DataFrame,
+    day_ts: np.ndarray,
+    day_hi: np.ndarray,
+    day_lo: np.ndarray,
+    day_close: np.ndarray,
     side: str,
     box_high: float,
     box_low: float,
     break_end_paris: pd.Timestamp,
-    break_date_ny,
+    cutoff_ns: int,
     break_px: float,
     tp_r: float,
     overext_mult: float,
     retest_minutes: int
 ) -> Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]:
     """
-    Règles strictes :
-    - Retest STRICTEMENT après la bougie de cassure.
-    - Sur la 1ère bougie d'entrée : si SL touché -> SL direct ; si TP seul -> on ignore le TP et on continue ;
-      si TP+SL sur la même bougie -> SL.
-    SL placé selon STOP_FRAC (% de la box depuis l’extrémité côté cassure).
+    Un seul setup, via le noyau _simulate_days_nb (mêmes règles que le backtest).
+    day_ts/day_hi/day_lo/day_close : tranches du jour (epoch-ns int64 + prix) issues des tableaux SoA.
     """
-    entry = box_high if side == "long" else box_low
-    stop, risk_points = compute_stop_and_risk(side, box_high, box_low, STOP_FRAC)
-    if risk_points <= 0:
-        return None
-
-    end = break_end_paris + pd.Timedelta(minutes=retest_minutes)
-    w = day_paris[(day_paris.index > break_end_paris) & (day_paris.index < end)]
-    if w.empty:
+    levels = _trade_levels(side, box_high, box_low, break_px, tp_r, overext_mult)
+    if levels is None:
         return None
-
-    # Premier toucher du niveau d'entrée
-    hit = w[w["Low"] <= box_high] if side == "long" else w[w["High"] >= box_low]
-    if hit.empty:
-        return None
-
-    # Overextension avant entrée
-    if overext_mult and overext_mult > 0 and np.isfinite(overext_mult):
-        box_mid_val = (box_high + box_low) / 2.0
-        dist_from_mid = abs(float(break_px) - box_mid_val)
-        if dist_from_mid > 0:
-            entry_ts_candidate = hit.index[0]
-            pre = w[w.index < entry_ts_candidate]
-            if not pre.empty:
-                if side == "long":
-                    runup = float(pre["High"].max()) - float(break_px)
-                    if runup > overext_mult * dist_from_mid:
-                        return None
-                else:
-                    rundown = float(break_px) - float(pre["Low"].min())
-                    if rundown > overext_mult * dist_from_mid:
-                        return None
-
-    entry_ts = hit.index[0]
-    cutoff_paris = pd.Timestamp(f"{break_date_ny} {MAX_TRADE_END_NY}", tz=EXCHANGE_TZ).tz_convert(LOCAL_TZ)
-
-    trail = day_paris[(day_paris.index >= entry_ts) & (day_paris.index <= cutoff_paris)]
-    if trail.empty:
+    entry, stop, tp, limit, risk_points = levels
+    brk_end_ns = break_end_paris.value
+    i_entry, i_exit, px, code = _simulate_days_nb(
+        day_ts, day_hi, day_lo, day_close,
+        np.zeros(1, dtype=np.int64), np.full(1, day_ts.shape[0], dtype=np.int64),
+        np.full(1, brk_end_ns, dtype=np.int64), np.full(1, brk_end_ns + retest_minutes * _MINUTE_NS, dtype=np.int64),
+        np.full(1, cutoff_ns, dtype=np.int64),
+        np.full(1, entry), np.full(1, stop), np.full(1, tp), np.full(1, float(break_px)), np.full(1, limit),
+        np.full(1, side == "long", dtype=np.bool_),
+    )
+    if i_entry[0] < 0:
         return None
-
-    # Définition du TP à tp_r * risk_points depuis l'entrée
-    if side == "long":
-        tp = entry + tp_r * risk_points
-    else:
-        tp = entry - tp_r * risk_points
-
-    first_bar = True
-    for ts, row in trail.iterrows():
-        hi, lo = float(row["High"]), float(row["Low"])
-
-        if first_bar:
-            if side == "long":
-                touched_tp = hi >= tp
-                touched_stop = lo <= stop
-                if touched_tp and touched_stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-                if touched_stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-                # touched_tp seul -> on ignore et on continue
-            else:
-                touched_tp = lo <= tp
-                touched_stop = hi >= stop
-                if touched_tp and touched_stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-                if touched_stop:
-                    return entry_ts, ts, stop, "SL", risk_points
-                # touched_tp seul -> on ignore et on continue
-            first_bar = False
+    return _paris_ts(day_ts[i_entry[0]]), _paris_ts(day_ts[i_exit[0]]), float(px[0]), REASON_NAMES[code[0]], risk_points
+
+def _simulate_setups(ohlc_paris: pd.DataFrame,
+                     setups: List[Dict[str, Any]]) -> List[Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]]:
+    """Simulation de toutes les setups en un appel de _simulate_days_nb."""
+    sims: List[Optional[Tuple[pd.Timestamp, pd.Timestamp, float, str, float]]] = [None] * len(setups)
+    live: List[int] = []
+    levels: List[Tuple[int, int, int, int, int, float, float, float, float, float, bool, float]] = []
+    tp_r, overext_mult = float(TP_R), float(OVEREXT_MULT)
+    retest_ns = int(RETEST_MINUTES) * _MINUTE_NS
+    for i, st in enumerate(setups):
+        lv = _trade_levels(st["side"], st["box_high"], st["box_low"], st["break_px"], tp_r, overext_mult)
+        if lv is None:
             continue
-
-        if side == "long":
-            if lo <= stop:
-                return entry_ts, ts, stop, "SL", risk_points
-            if hi >= tp:
-                return entry_ts, ts, tp, "TP", risk_points
-        else:
-            if hi >= stop:
-                return entry_ts, ts, stop, "SL", risk_points
-            if lo <= tp:
-                return entry_ts, ts, tp, "TP", risk_points
-
-    # Pas de TP ni SL -> TIMEOUT
-    return entry_ts, trail.index[-1], float(trail.iloc[-1]["Close"]), "TIMEOUT", risk_points
-
-def body_and_range_pass(side: str, bh: float, bl: float,
-                        o: float, h: float, l: float, c: float,
-                        body_outside_frac_min: float,
-                        range_vs_box_min: float) -> bool:
-    lo_body, hi_body = min(o, c), max(o, c)
+        entry, stop, tp, limit, risk = lv
+        brk_end_ns = st["break_end"].value
+        live.append(i)
+        levels.append((*st["day_bounds"], brk_end_ns, brk_end_ns + retest_ns, st["cutoff_ns"],
+                       entry, stop, tp, float(st["break_px"]), limit, st["side"] == "long", risk))
+    if not live:
+        return sims
+
+    cols = list(zip(*levels))
+    d0, d1, brk_end, retest_end, cutoff = (np.array(c, dtype=np.int64) for c in cols[:5])
+    entry, stop, tp, break_px, limit = (np.array(c, dtype=np.float64) for c in cols[5:10])
+    side_long = np.array(cols[10], dtype=np.bool_)
+    risks = cols[11]
+    T = _epoch_ns(ohlc_paris.index)
+    i_entry, i_exit, px, code = _simulate_days_nb(
+        T, ohlc_paris["High"].to_numpy(), ohlc_paris["Low"].to_numpy(), ohlc_paris["Close"].to_numpy(),
+        d0, d1, brk_end, retest_end, cutoff, entry, stop, tp, break_px, limit, side_long,
+    )
+    for n, i in enumerate(live):
+        if i_entry[n] < 0:
+            continue
+        sims[i] = (_paris_ts(T[i_entry[n]]), _paris_ts(T[i_exit[n]]), float(px[n]), REASON_NAMES[code[n]], risks[n])
+    return sims
+
+def _first_last_valid(values: np.ndarray, bucket_id: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """1ère et dernière valeur non-NaN de chaque segment (NaN si aucune), comme first()/last() de pandas."""
+    # dtype flottant pour la sentinelle NaN, même si les prix arrivent en entiers (int64 -> float64)
+    dtype = np.result_type(values.dtype, np.float32)
+    first = np.full(n_buckets, np.nan, dtype=dtype)
+    last = np.full(n_buckets, np.nan, dtype=dtype)
+    ok = np.flatnonzero(~np.isnan(values))
+    if ok.size:
+        ids = bucket_id[ok]
+        ids_first, pos_first = np.unique(ids, return_index=True)
+        first[ids_first] = values[ok[pos_first]]
+        ids_last, pos_last = np.unique(ids[::-1], return_index=True)
+        last[ids_last] = values[ok[::-1][pos_last]]
+    return first, last
+
+def break_candles(ohlc_paris: pd.DataFrame, T: np.ndarray) -> pd.DataFrame:
+    """
+    Bougies BREAK_TF, identiques à resample(BREAK_TF, label="left", closed="left").agg(FiveMinAgg).dropna(),
+    calculées par réductions segmentées sur les tableaux (T : index epoch-ns trié).
+    """
+    if T.size == 0:
+        return ohlc_paris.iloc[:0]
+    # Grille du resample : origine = minuit (Paris) du 1er jour, pas de BREAK_TF
+    tf_ns = _BREAK_TD.value
+    origin = _epoch_ns(ohlc_paris.index[:1].normalize())[0]
+    bucket = origin + (T - origin) // tf_ns * tf_ns
+    new_bucket = np.r_[True, bucket[1:] != bucket[:-1]]
+    starts = np.flatnonzero(new_bucket)
+    bucket_id = np.cumsum(new_bucket) - 1
+    # first/last de pandas ignorent les NaN (prix vides du CSV) : 1ère / dernière valeur valide du segment
+    opens, _ = _first_last_valid(ohlc_paris["Open"].to_numpy(), bucket_id, starts.size)
+    _, closes = _first_last_valid(ohlc_paris["Close"].to_numpy(), bucket_id, starts.size)
+    df_brk = pd.DataFrame(
+        {
+            "Open": opens,
+            "High": np.fmax.reduceat(ohlc_paris["High"].to_numpy(), starts),
+            "Low": np.fmin.reduceat(ohlc_paris["Low"].to_numpy(), starts),
+            "Close": closes,
+        },
+        index=pd.to_datetime(bucket[starts], utc=True).tz_convert(LOCAL_TZ).rename(ohlc_paris.index.name),
+    )
+    return df_brk.dropna()
+
+def _break_bar_ok(side_long, bh, bl, o, h, l, c, wick_max, body_min, range_min):
+    """Filtres mèche côté cassure (<= wick_max), corps hors box (>= body_min) et range vs box (>= range_min), par bougie."""
     rng = max(h - l, 1e-12)
-    box_h = max(bh - bl, 1e-12)
-
-    if side == "long":
-        body_out = max(0.0, hi_body - max(bh, lo_body)) if hi_body > bh else 0.0
-    else:
-        body_out = (min(bl, hi_body) - lo_body) if lo_body < bl else 0.0
-
-    body_frac = body_out / max(hi_body - lo_body, 1e-12)
-    range_frac = rng / box_h
-    return (body_frac >= body_outside_frac_min) and (range_frac >= range_vs_box_min)
+    hi_body = max(o, c)
+    lo_body = min(o, c)
+    # Sans branche : max(0, ...) vaut déjà 0 quand le corps ne dépasse pas la box ; min/max -> sélections
+    wick_out = max(0.0, h - hi_body) if side_long else max(0.0, lo_body - l)
+    body_out = max(0.0, hi_body - max(bh, lo_body)) if side_long else max(0.0, min(bl, hi_body) - lo_body)
+    return ((wick_out / rng <= wick_max)
+            & (body_out / max(hi_body - lo_body, 1e-12) >= body_min)
+            & (rng / max(bh - bl, 1e-12) >= range_min))
+
+if HAVE_NUMBA:
+    # ufunc compilée : une seule passe sur les bougies de cassure, sans tableaux intermédiaires
+    _break_bar_ufunc = vectorize(["b1(b1,f8,f8,f8,f8,f8,f8,f8,f8,f8)"], nopython=True, cache=True)(_break_bar_ok)
+else:
+    # Sans numba : la même fonction scalaire, appliquée élément par élément
+    _break_bar_ufunc = np.vectorize(_break_bar_ok, otypes=[bool])
+
+def break_bar_pass(side_long: np.ndarray, bh: np.ndarray, bl: np.ndarray,
+                   o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+                   wick_out_max_frac: float, body_outside_frac_min: float,
+                   range_vs_box_min: float) -> np.ndarray:
+    """Masque des bougies de cassure qui passent les filtres mèche + corps/range."""
+    return _break_bar_ufunc(side_long, bh, bl, o, h, l, c,
+                            wick_out_max_frac, body_outside_frac_min, range_vs_box_min)
 
 def build_daily_setups(ohlc_paris: pd.DataFrame) -> List[Dict[str, Any]]:
     setups: List[Dict[str, Any]] = []
 
-    # agrégation au TF choisi pour la bougie de cassure
-    df_brk = ohlc_paris.resample(BREAK_TF, label="left", closed="left").agg(FiveMinAgg).dropna()
+    # Tableaux SoA (struct-of-arrays) : un buffer contigu par colonne + index epoch-ns int64
+    T = _epoch_ns(ohlc_paris.index)
+    H = ohlc_paris["High"].to_numpy()
+    L = ohlc_paris["Low"].to_numpy()
 
-    for date_paris, day_paris in ohlc_paris.resample("D"):
-        if day_paris.empty:
+    # agrégation au TF choisi pour la bougie de cassure
+    df_brk = break_candles(ohlc_paris, T)
+    # conversion NY + fenêtre de scan calculées une seule fois pour toutes les bougies
+    df_brk_ny_all = df_brk.tz_convert(EXCHANGE_TZ)
+    in_scan = between_time_mask(df_brk_ny_all.index, BREAK_SCAN_START_NY, BREAK_SCAN_END_NY)
+    brk_ts = _epoch_ns(df_brk.index)
+    brk_ohlc = df_brk[["Open", "High", "Low", "Close"]].to_numpy()
+    trade_end_ny = time.fromisoformat(MAX_TRADE_END_NY)
+
+    in_open = between_time_mask(ohlc_paris.index.tz_convert(EXCHANGE_TZ), OPEN_START_NY, OPEN_END_NY)
+    # Aucune bougie d'open (frame vide compris) : pas de box, donc pas de setup
+    open_rows = np.flatnonzero(in_open)
+    if open_rows.size == 0:
+        return setups
+
+    # Bornes [début ; fin[ de chaque jour calendaire Paris (index trié)
+    day_index = ohlc_paris.index.normalize()
+    day_codes = _epoch_ns(day_index)
+    new_day = np.r_[True, day_codes[1:] != day_codes[:-1]]
+    day_starts = np.flatnonzero(new_day)
+    day_ends = np.r_[day_starts[1:], len(day_codes)]
+    day_id = np.cumsum(new_day) - 1
+
+    # Bougies de cassure de chaque jour : bornes [lo ; hi[ en une seule recherche
+    brk_lo = brk_ts.searchsorted(T[day_starts], "left")
+    brk_hi = brk_ts.searchsorted(T[day_ends - 1], "right")
+
+    # Box de chaque jour sur la fenêtre d’open NY, groupée par jour (seuls les jours observés)
+    box_days, box_first = np.unique(day_id[open_rows], return_index=True)
+    # fmax/fmin ignorent les NaN comme pandas
+    box_highs = np.fmax.reduceat(H[open_rows], box_first)
+    box_lows = np.fmin.reduceat(L[open_rows], box_first)
+
+    # Jours candidats (box valide + cassure), filtrés ensuite en une passe avant toute construction de setup
+    cands: List[Tuple[int, float, float, str, pd.Timestamp, pd.Timestamp, float, float, float, float, float]] = []
+    for d, bh, bl in zip(box_days.tolist(), box_highs.tolist(), box_lows.tolist()):
+        lo, hi = int(brk_lo[d]), int(brk_hi[d])
+        if lo >= hi or not passes_box_filter(bh, bl):
             continue
-
-        day_brk = df_brk.loc[day_paris.index.min(): day_paris.index.max()]
-        if day_brk.empty:
+        scan_pos = lo + np.flatnonzero(in_scan[lo:hi])
+        side, bstart_paris, bend_paris, break_px, idx = first_break_close_out(df_brk_ny_all.iloc[scan_pos], bh, bl)
+        if side is None:
             continue
 
-        # Box sur la fenêtre d’open NY
-        day_ny = day_paris.tz_convert(EXCHANGE_TZ)
-        box_ny = day_ny.between_time(OPEN_START_NY, OPEN_END_NY)
-        if box_ny.empty:
-            continue
+        # Bougie de cassure lue par position dans les OHLC BREAK_TF (pas de lookup par label)
+        o5, h5, l5, c5 = map(float, brk_ohlc[scan_pos[idx]])
+        cands.append((d, bh, bl, side, bstart_paris, bend_paris, break_px, o5, h5, l5, c5))
 
-        bh, bl = float(box_ny["High"].max()), float(box_ny["Low"].min())
-        if not passes_box_filter(bh, bl):
-            continue
+    if not cands:
+        return setups
 
-        side, bstart_paris, bend_paris, break_px = first_break_close_out(day_brk, bh, bl)
-        if side is None:
-            continue
-
-        r = day_brk.loc[bstart_paris]
-        o5, h5, l5, c5 = map(float, (r["Open"], r["High"], r["Low"], r["Close"]))
+    # Filtre mèche côté cassure + filtre corps/range sur toutes les bougies de cassure candidates
+    cols = list(zip(*cands))
+    side_long = np.array([sd == "long" for sd in cols[3]], dtype=bool)
+    bhs, bls = np.array(cols[1], dtype=float), np.array(cols[2], dtype=float)
+    o5s, h5s, l5s, c5s = (np.array(c, dtype=float) for c in cols[7:11])
+    keep = break_bar_pass(side_long, bhs, bls, o5s, h5s, l5s, c5s,
+                          float(WICK_OUT_MAX_FRAC), float(BODY_OUTSIDE_FRAC_MIN), float(RANGE_VS_BOX_MIN))
 
+    for (d, bh, bl, side, bstart_paris, bend_paris, break_px, o5, h5, l5, c5), ok in zip(cands, keep.tolist()):
+        if not ok:
+            continue
+        s, e = int(day_starts[d]), int(day_ends[d])
         trade_date_ny = bstart_paris.tz_convert(EXCHANGE_TZ).date()
+        # Fin de suivi du trade (MAX_TRADE_END_NY le jour NY de la cassure), en epoch-ns
+        cutoff_ns = pd.Timestamp.combine(trade_date_ny, trade_end_ny).tz_localize(EXCHANGE_TZ).value
+        # Pas de copie des prix du jour : seulement ses bornes [s ; e[ dans les tableaux SoA
         setups.append(dict(
-            date_paris=date_paris.date(),
-            day_paris=day_paris,
+            date_paris=day_index[s].date(),
+            day_bounds=(s, e),
             box_high=bh,
             box_low=bl,
             side=side,
@@ -316,6 +539,7 @@ def build_daily_setups(ohlc_paris: pd.DataFrame) -> List[Dict[str, Any]]:
             break_end=bend_paris,
             break_px=break_px,
             trade_date_ny=trade_date_ny,
+            cutoff_ns=cutoff_ns,
             o5=o5, h5=h5, l5=l5, c5=c5,
         ))
 
@@ -325,35 +549,12 @@ def build_daily_setups(ohlc_paris: pd.DataFrame) -> List[Dict[str, Any]]:
 # RUN & REPORTS
 # =====================================================
 def run_strategy(ohlc_paris: pd.DataFrame) -> pd.DataFrame:
+    # Setups déjà filtrées (box, mèche, corps/range) par build_daily_setups
     setups = build_daily_setups(ohlc_paris)
     rows: List[List[Any]] = []
 
-    for st in setups:
-        # 1) Filtre mèche côté cassure
-        if outside_wick_frac(st["side"], st["box_high"], st["box_low"],
-                             st["o5"], st["h5"], st["l5"], st["c5"]) > WICK_OUT_MAX_FRAC:
-            continue
-
-        # 2) Filtre corps/range
-        if not body_and_range_pass(
-            st["side"], st["box_high"], st["box_low"], st["o5"], st["h5"], st["l5"], st["c5"],
-            BODY_OUTSIDE_FRAC_MIN, RANGE_VS_BOX_MIN
-        ):
-            continue
-
-        # 3) Simulation
-        sim = simulate_trade(
-            day_paris=st["day_paris"],
-            side=st["side"],
-            box_high=st["box_high"],
-            box_low=st["box_low"],
-            break_end_paris=st["break_end"],
-            break_date_ny=st["trade_date_ny"],
-            break_px=st["break_px"],
-            tp_r=float(TP_R),
-            overext_mult=float(OVEREXT_MULT),
-            retest_minutes=int(RETEST_MINUTES),
-        )
+    # Simulation : jours indépendants, tous suivis dans un seul noyau parallèle
+    for st, sim in zip(setups, _simulate_setups(ohlc_paris, setups)):
         if not sim:
             continue
 
@@ -371,7 +572,7 @@ def run_strategy(ohlc_paris: pd.DataFrame) -> pd.DataFrame:
     if trades.empty:
         return trades
 
-    trades["cum_R"] = trades["R"].cumsum()
+    trades["cum_R"] = np.cumsum(trades["R"].to_numpy(dtype=np.float64))
     return trades
 
 def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataFrame:
@@ -389,7 +590,8 @@ def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataF
     r_mean = t["R"].mean()
     r_total = t["R"].sum()
     r_timeout = t.loc[t["reason"] == "TIMEOUT", "R"].mean() if to_c > 0 else 0.0
-    max_dd = (t["cum_R"].cummax() - t["cum_R"]).max()
+    cum = t["cum_R"].to_numpy(dtype=np.float64)
+    max_dd = (np.maximum.accumulate(cum) - cum).max()
 
     nb_days = (ohlc_paris.index.date.max() - ohlc_paris.index.date.min()).days + 1
     trades_per_day = (n / nb_days) if nb_days > 0 else 0.0
@@ -400,35 +602,39 @@ def summarize_global(trades: pd.DataFrame, ohlc_paris: pd.DataFrame) -> pd.DataF
 
 def summarize_monthly_2025(trades: pd.DataFrame) -> pd.DataFrame:
     t = trades.copy()
+    # entry_ts est déjà en heure de Paris (tz-aware) : pas de reparse ni de conversion
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=UserWarning)
-        t["month"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.to_period("M").astype(str)
-    t["year"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.year
+        t["month"] = t["entry_ts"].dt.to_period("M").astype(str)
+    t["year"] = t["entry_ts"].dt.year
     t25 = t[t["year"] == 2025]
     if t25.empty:
         return pd.DataFrame(columns=["month", "Trades", "TP", "SL", "TIMEOUT", "Winrate_%", "R_mean", "R_total", "Max_DD_R"])
 
-    rows = []
-    for m, g in t25.groupby("month"):
-        g = g.sort_values("exit_ts")
-        cum = g["R"].cumsum()
-        rows.append([
-            m,
-            len(g),
-            (g["reason"] == "TP").sum(),
-            (g["reason"] == "SL").sum(),
-            (g["reason"] == "TIMEOUT").sum(),
-            g["reason"].eq("TP").mean() * 100.0,
-            g["R"].mean(),
-            g["R"].sum(),
-            float((cum.cummax() - cum).max()),
-        ])
-    return pd.DataFrame(rows, columns=["month","Trades","TP","SL","TIMEOUT","Winrate_%","R_mean","R_total","Max_DD_R"]).sort_values("month").reset_index(drop=True)
+    # Agrégats mensuels en un seul groupby (trades triés une fois par sortie => Max_DD_R par mois)
+    t25 = t25.sort_values("exit_ts").assign(
+        is_tp=t25["reason"].eq("TP"),
+        is_sl=t25["reason"].eq("SL"),
+        is_to=t25["reason"].eq("TIMEOUT"),
+    )
+    cum = t25.groupby("month")["R"].cumsum()
+    t25["dd"] = cum.groupby(t25["month"]).cummax() - cum
+    monthly = t25.groupby("month").agg(
+        Trades=("R", "size"),
+        TP=("is_tp", "sum"),
+        SL=("is_sl", "sum"),
+        TIMEOUT=("is_to", "sum"),
+        R_mean=("R", "mean"),
+        R_total=("R", "sum"),
+        Max_DD_R=("dd", "max"),
+    )
+    monthly.insert(4, "Winrate_%", monthly["TP"] / monthly["Trades"] * 100.0)
+    return monthly.reset_index()
 
 def make_last_10(trades: pd.DataFrame) -> pd.DataFrame:
     t = trades.sort_values("exit_ts").tail(10).copy()
-    t["entry_time"] = pd.to_datetime(t["entry_ts"]).dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
-    t["exit_time"] = pd.to_datetime(t["exit_ts"]).dt.tz_convert(LOCAL_TZ).dt.strftime("%H:%M")
+    t["entry_time"] = t["entry_ts"].dt.strftime("%H:%M")
+    t["exit_time"] = t["exit_ts"].dt.strftime("%H:%M")
     return t[["date","side","entry_time","entry","exit_time","exit_px","reason","R"]].copy()
 
 # =====================================================